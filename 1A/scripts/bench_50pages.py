@@ -0,0 +1,487 @@
+# scripts/bench_50pages.py
+"""
+Reproducible Task 1A benchmark on synthetic PDFs.
+
+Every case is generated deterministically with PyMuPDF (seeded text, fixed
+fonts, no timestamps), then run through `run_pipeline` on the heuristic path
+and, for documents with a TOC, on the tagged path as well.
+
+    # quick suite, compare against the stored baseline (exit 1 on regression)
+    python -m scripts.bench_50pages
+
+    # full suite up to 2,000 pages, write a new baseline
+    python -m scripts.bench_50pages --suite full --save-baseline
+
+Reported per case/path: p50/p95 latency, pages/s, lines/s, peak RSS, and the
+p50 time, peak RSS and RSS growth of every pipeline stage. Runs have no
+deadline (timing.anytime would cut long documents short); a case that still
+comes back partial fails the bench instead of reporting its throughput.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from src.common.config import load_config, Task1AConfig
+from src.common.timing import Deadline, StageTimer
+from src.task1a import semantic_filter
+from src.task1a.pipeline import run_pipeline
+
+DEFAULT_BASELINE = Path(__file__).with_name("bench_baseline.json")
+
+# -------------------------
+# Synthetic documents
+# -------------------------
+
+_WORDS = (
+    "system data model process analysis result method design value report "
+    "network policy market service quality energy budget review project "
+    "research student program support access resource planning strategy "
+    "the of and to in for with on by from as at is are was be this that "
+    "which into over under between during across within per each all"
+).split()
+
+_BULLETS = ("•", "-", "◦", "▪")
+
+# (body, heading, mono) base-14 font names
+_FONT_MIXES = {
+    "single": ("helv", "helv", "helv"),
+    "mixed": ("tiro", "hebo", "cour"),
+}
+
+
+@dataclass(frozen=True)
+class DocSpec:
+    name: str
+    pages: int
+    lines_per_page: int = 40
+    fonts: str = "single"        # key of _FONT_MIXES
+    numbered: bool = False       # "2.3 Title" style headings
+    bullets: bool = False        # bullet blocks between paragraphs
+    images: bool = False         # one raster image per page
+    toc: bool = False            # write an outline (tagged path)
+    seed: int = 1
+
+    def digest(self) -> str:
+        blob = json.dumps(asdict(self), sort_keys=True).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()[:12]
+
+
+SUITES: Dict[str, List[DocSpec]] = {
+    "quick": [
+        DocSpec("p1_plain", pages=1),
+        DocSpec("p10_numbered_mixed", pages=10, fonts="mixed", numbered=True),
+        DocSpec("p50_bullets_images", pages=50, numbered=True, bullets=True, images=True),
+        DocSpec("p50_toc", pages=50, fonts="mixed", numbered=True, toc=True),
+        DocSpec("p200_dense", pages=200, lines_per_page=60, fonts="mixed", bullets=True),
+        DocSpec("p200_toc", pages=200, numbered=True, toc=True),
+    ],
+}
+SUITES["full"] = SUITES["quick"] + [
+    DocSpec("p1000_sparse", pages=1000, lines_per_page=15, numbered=True, images=True),
+    DocSpec("p2000_mixed", pages=2000, fonts="mixed", numbered=True, bullets=True),
+    DocSpec("p2000_toc", pages=2000, fonts="mixed", numbered=True, bullets=True, toc=True),
+]
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    words = [rng.choice(_WORDS) for _ in range(n)]
+    words[0] = words[0].capitalize()
+    return " ".join(words)
+
+
+def _pixmap(seed: int) -> fitz.Pixmap:
+    rng = np.random.default_rng(seed)
+    samples = rng.integers(0, 256, size=48 * 48 * 3, dtype=np.uint8).tobytes()
+    return fitz.Pixmap(fitz.csRGB, 48, 48, samples, False)
+
+
+def generate_pdf(spec: DocSpec, out_path: Path) -> int:
+    """Write the synthetic PDF for `spec`; returns the number of text lines drawn."""
+    rng = random.Random(spec.seed)
+    body_font, head_font, mono_font = _FONT_MIXES[spec.fonts]
+    width, height = fitz.paper_size("letter")
+    margin, body_size = 72.0, 10.0
+    leading = body_size * 1.45
+    pix = _pixmap(spec.seed) if spec.images else None
+
+    doc = fitz.open()
+    toc: List[List[Any]] = []
+    chapter = section = 0
+    lines_drawn = 0
+
+    for pno in range(spec.pages):
+        page = doc.new_page(width=width, height=height)
+        # one Shape per page: page.insert_text re-registers the font on every
+        # call, which makes generation and garbage collection on save quadratic
+        shape = page.new_shape()
+        y = margin
+        if pix is not None:
+            page.insert_image(fitz.Rect(width - margin - 48, 24, width - margin, 72), pixmap=pix)
+
+        if pno == 0:
+            shape.insert_text((margin, y + 14), f"Synthetic Report {spec.name}", fontsize=22, fontname=head_font)
+            y += 40
+            lines_drawn += 1
+
+        budget = spec.lines_per_page
+        while budget > 0 and y < height - margin:
+            roll = rng.random()
+            if roll < 0.08:
+                # heading: chapter or section
+                if section >= 3 or chapter == 0 or roll < 0.02:
+                    chapter, section = chapter + 1, 0
+                    level, size = 1, 16.0
+                    label = f"{chapter}. " if spec.numbered else ""
+                else:
+                    section += 1
+                    level, size = 2, 13.0
+                    label = f"{chapter}.{section} " if spec.numbered else ""
+                title = label + _sentence(rng, rng.randint(2, 5)).title()
+                y += leading * 0.8
+                shape.insert_text((margin, y), title, fontsize=size, fontname=head_font)
+                toc.append([level, title, pno + 1])
+                y += size * 1.3
+            elif spec.bullets and roll < 0.20:
+                for _ in range(rng.randint(2, 4)):
+                    text = f"{rng.choice(_BULLETS)} {_sentence(rng, rng.randint(4, 9))}"
+                    shape.insert_text((margin + 12, y), text, fontsize=body_size, fontname=body_font)
+                    y += leading
+                    budget -= 1
+                    lines_drawn += 1
+                continue
+            elif roll < 0.23:
+                shape.insert_text((margin, y), _sentence(rng, 6), fontsize=body_size - 1, fontname=mono_font)
+                y += leading
+            else:
+                shape.insert_text((margin, y), _sentence(rng, rng.randint(9, 13)), fontsize=body_size, fontname=body_font)
+                y += leading
+            budget -= 1
+            lines_drawn += 1
+
+        # running footer, repeated on every page
+        shape.insert_text((width / 2 - 10, height - 36), str(pno + 1), fontsize=8, fontname=body_font)
+        lines_drawn += 1
+        shape.commit()
+
+    if spec.toc:
+        doc.set_toc(toc)
+    doc.set_metadata({})
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    doc.save(out_path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+    return lines_drawn
+
+
+def materialize(spec: DocSpec, workdir: Path) -> Tuple[Path, int]:
+    """Generate (or reuse) the PDF for `spec` under `workdir`."""
+    pdf_path = workdir / f"{spec.name}-{spec.digest()}.pdf"
+    meta_path = pdf_path.with_suffix(".lines")
+    if pdf_path.exists() and meta_path.exists():
+        return pdf_path, int(meta_path.read_text())
+    n = generate_pdf(spec, pdf_path)
+    meta_path.write_text(str(n))
+    return pdf_path, n
+
+
+# -------------------------
+# RSS tracking
+# -------------------------
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _current_rss() -> int:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # no procfs: fall back to the process high-water mark
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """
+    Polls RSS on a background thread and attributes each sample to the stages
+    open at that moment; stage boundaries are sampled synchronously so short
+    stages still get a reading. `peaks` is the absolute high-water mark per
+    stage, `growth` the largest rise above the RSS at stage entry.
+    """
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.active: List[str] = []
+        self.peaks: Dict[str, int] = {}
+        self.growth: Dict[str, int] = {}
+        self._entry: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _sample(self) -> None:
+        rss = _current_rss()
+        with self._lock:
+            for name in self.active + ["total"]:
+                if rss > self.peaks.get(name, 0):
+                    self.peaks[name] = rss
+            for name in self.active:
+                rise = rss - self._entry[name]
+                if rise > self.growth.get(name, 0):
+                    self.growth[name] = rise
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def enter(self, name: str) -> None:
+        rss = _current_rss()
+        with self._lock:
+            self._entry[name] = rss
+            self.active.append(name)
+        self._sample()
+
+    def exit(self, name: str) -> None:
+        self._sample()
+        with self._lock:
+            self.active.remove(name)
+
+    def __enter__(self) -> "RssSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class ProfilingTimer(StageTimer):
+    """StageTimer that also reports stage boundaries to an RssSampler."""
+
+    def __init__(self, sampler: RssSampler):
+        super().__init__()
+        self.sampler = sampler
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self.sampler.enter(name)
+        try:
+            with super().stage(name):
+                yield
+        finally:
+            self.sampler.exit(name)
+
+
+# -------------------------
+# Runs
+# -------------------------
+
+def _path_config(cfg: Task1AConfig, path: str) -> Task1AConfig:
+    cfg = copy.deepcopy(cfg)
+    if path == "heuristic":
+        cfg.tagged.min_toc_entries = 10**9  # ignore any TOC
+    return cfg
+
+
+def _pct(values: List[float], q: float) -> float:
+    return float(np.percentile(np.asarray(values, dtype=float), q))
+
+
+def bench_case(
+    spec: DocSpec,
+    path: str,
+    pdf_path: Path,
+    n_lines: int,
+    cfg: Task1AConfig,
+    repeat: int,
+) -> Dict[str, Any]:
+    run_cfg = _path_config(cfg, path)
+    # no deadline: every run covers the whole document, so pages/s is honest
+    run_pipeline(pdf_path, run_cfg, deadline=Deadline(None))  # warm-up: imports, font caches, page cache
+
+    latencies: List[float] = []
+    stage_times: Dict[str, List[float]] = {}
+    headings = 0
+    partial = False
+    with RssSampler() as sampler:
+        for _ in range(repeat):
+            timer = ProfilingTimer(sampler)
+            start = perf_counter()
+            result = run_pipeline(pdf_path, run_cfg, timer=timer, deadline=Deadline(None))
+            latencies.append(perf_counter() - start)
+            headings = len(result["outline"])
+            partial = partial or bool(result.get("partial")) or bool(timer.counters.get("pages_skipped"))
+            for name, secs in timer.stages.items():
+                stage_times.setdefault(name, []).append(secs)
+
+    p50 = _pct(latencies, 50)
+    return {
+        "case": spec.name,
+        "path": path,
+        "pages": spec.pages,
+        "lines": n_lines,
+        "headings": headings,
+        "partial": partial,
+        "p50_s": round(p50, 6),
+        "p95_s": round(_pct(latencies, 95), 6),
+        "pages_per_s": round(spec.pages / p50, 2),
+        "lines_per_s": round(n_lines / p50, 2),
+        "peak_rss_mb": round(sampler.peaks.get("total", 0) / 2**20, 1),
+        "stages": {
+            name: {
+                "p50_s": round(_pct(ts, 50), 6),
+                "peak_rss_mb": round(sampler.peaks.get(name, 0) / 2**20, 1),
+                "rss_growth_mb": round(sampler.growth.get(name, 0) / 2**20, 1),
+            }
+            for name, ts in sorted(stage_times.items())
+        },
+    }
+
+
+def run_suite(specs: List[DocSpec], cfg: Task1AConfig, workdir: Path, repeat: int) -> List[Dict[str, Any]]:
+    semantic_filter.warm_up(cfg.semantic_filter)
+    results = []
+    for spec in specs:
+        pdf_path, n_lines = materialize(spec, workdir)
+        for path in (("heuristic", "tagged") if spec.toc else ("heuristic",)):
+            r = bench_case(spec, path, pdf_path, n_lines, cfg, repeat)
+            results.append(r)
+            print(
+                f"{r['case']:<22} {r['path']:<9} p50 {r['p50_s'] * 1e3:9.1f} ms  "
+                f"p95 {r['p95_s'] * 1e3:9.1f} ms  {r['pages_per_s']:9.1f} pages/s  "
+                f"{r['lines_per_s']:10.1f} lines/s  rss {r['peak_rss_mb']:7.1f} MB"
+                + ("  PARTIAL" if r["partial"] else ""),
+                flush=True,
+            )
+    return results
+
+
+# -------------------------
+# Baseline
+# -------------------------
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    min_delta: float,
+) -> List[str]:
+    """
+    Return one message per regression against `baseline`. A case regresses when
+    its p50 is both `tolerance` (relative) and `min_delta` seconds slower, so
+    millisecond-scale cases do not flag on scheduler noise.
+    """
+    base = {(r["case"], r["path"]): r for r in baseline.get("results", [])}
+    problems: List[str] = []
+    for r in results:
+        b = base.get((r["case"], r["path"]))
+        if b is None:
+            continue
+        key = f"{r['case']}/{r['path']}"
+        if r["headings"] != b["headings"]:
+            problems.append(f"{key}: headings {b['headings']} -> {r['headings']}")
+        ratio = r["p50_s"] / max(b["p50_s"], 1e-9)
+        if ratio > 1.0 + tolerance and r["p50_s"] - b["p50_s"] > min_delta:
+            problems.append(f"{key}: p50 {b['p50_s'] * 1e3:.1f} -> {r['p50_s'] * 1e3:.1f} ms ({ratio:.2f}x)")
+            for name, st in r["stages"].items():
+                bst = b.get("stages", {}).get(name)
+                if bst and st["p50_s"] > bst["p50_s"] * (1.0 + tolerance) and st["p50_s"] - bst["p50_s"] > min_delta / 2:
+                    problems.append(
+                        f"{key}:   stage {name} {bst['p50_s'] * 1e3:.1f} -> {st['p50_s'] * 1e3:.1f} ms"
+                    )
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", default="quick", choices=sorted(SUITES))
+    parser.add_argument("--case", action="append", default=None, help="Run only these case names.")
+    parser.add_argument("--config", type=Path, default=Path("configs/task1a.yaml"))
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (after one warm-up).")
+    parser.add_argument("--workdir", type=Path, default=Path(tempfile.gettempdir()) / "task1a-bench")
+    parser.add_argument("--out", type=Path, default=None, help="Write the full results as JSON.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite --baseline with this run.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed p50 slowdown vs baseline before a case counts as a regression.",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=5.0,
+        help="Ignore slowdowns smaller than this many milliseconds.",
+    )
+    args = parser.parse_args()
+
+    specs = SUITES[args.suite]
+    if args.case:
+        specs = [s for s in specs if s.name in set(args.case)]
+        if not specs:
+            parser.error(f"no such case in suite '{args.suite}': {args.case}")
+
+    cfg = load_config(args.config)
+    cfg.sharding.workers = 0  # measure the single-process pipeline
+    results = run_suite(specs, cfg, args.workdir, max(1, args.repeat))
+    report = {"suite": args.suite, "repeat": args.repeat, "environment": _environment(), "results": results}
+
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    partial = [f"{r['case']}/{r['path']}" for r in results if r["partial"]]
+    if partial:
+        # throughput of a cut-short run is meaningless; never compare or save it
+        print(f"{len(partial)} case(s) did not process the whole document: {', '.join(partial)}")
+        return 1
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("environment") != report["environment"]:
+        print("note: baseline was recorded in a different environment:", baseline.get("environment"))
+    problems = compare(results, baseline, args.tolerance, args.min_delta_ms / 1e3)
+    if problems:
+        print(f"{len(problems)} regression(s) vs {args.baseline}:")
+        print("\n".join(f"  {p}" for p in problems))
+        return 1
+    print(f"no regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
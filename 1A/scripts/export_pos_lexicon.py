@@ -0,0 +1,130 @@
+# scripts/export_pos_lexicon.py
+"""
+Build and check the spaCy-free POS lexicon used by semantic_filter.use_lexicon.
+
+    # export once, wherever the spaCy model is installed
+    python -m scripts.export_pos_lexicon export --corpus input --out configs/pos_lexicon.bin
+
+    # verdict agreement with spaCy on the lines of a PDF corpus
+    python -m scripts.export_pos_lexicon agree --corpus input --lexicon configs/pos_lexicon.bin
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, List
+
+from src.common import io as io_utils
+from src.common import pdf_reader as pr
+from src.common.config import load_config
+from src.task1a import semantic_filter
+from src.task1a.pos_lexicon import PosLexicon
+
+
+def _corpus_lines(corpus: Path, max_chars: int) -> Iterator[str]:
+    for pdf_path in io_utils.list_input_pdfs(corpus, recursive=True):
+        with pr.open_document(pdf_path) as doc:
+            layout = pr.DocumentLayout(doc)
+            for i in range(len(layout)):
+                for line in layout.page_lines(i):
+                    t = line.text.strip()
+                    if t and len(t) <= max_chars:
+                        yield t
+
+
+def _load_nlp(model: str):
+    nlp = semantic_filter._get_nlp_by_model(model)
+    if nlp is None:
+        sys.exit(f"spaCy model '{model}' is not installed")
+    return nlp
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    nlp = _load_nlp(args.model)
+    counts: Counter = Counter()
+
+    # words in context, from real documents
+    if args.corpus:
+        lines = list(_corpus_lines(args.corpus, args.max_chars))
+        for doc in nlp.pipe(lines, batch_size=256):
+            for tok in doc:
+                if tok.is_alpha:
+                    counts[(tok.text.lower(), tok.pos_)] += args.context_weight
+
+    # every alphabetic vocab entry, tagged in isolation (headings are short)
+    if args.vocab:
+        words = sorted({s.lower() for s in nlp.vocab.strings if s.isalpha() and len(s) > 2})
+        for w, doc in zip(words, nlp.pipe(words, batch_size=1024)):
+            if len(doc) == 1:
+                counts[(w, doc[0].pos_)] += 1
+
+    lexicon = PosLexicon.from_counts(
+        ((w, p, n) for (w, p), n in counts.items() if n >= args.min_count),
+        unknown_pos=args.unknown_pos,
+    )
+    lexicon.save(args.out)
+    print(f"wrote {len(lexicon.table)} words to {args.out} ({args.out.stat().st_size} bytes)")
+    return 0
+
+
+def cmd_agree(args: argparse.Namespace) -> int:
+    cfg = load_config(args.config)
+    sf = cfg.semantic_filter
+    content_pos = set(sf.content_pos)
+    nlp = _load_nlp(sf.model)
+    lexicon = PosLexicon.load(args.lexicon)
+
+    lines: List[str] = list(dict.fromkeys(_corpus_lines(args.corpus, sf.max_chars)))
+    agree = tok_agree = tok_total = 0
+    disagreements: List[str] = []
+    for text, doc in zip(lines, nlp.pipe(lines, batch_size=256)):
+        a = semantic_filter._doc_has_content_pos(doc, content_pos)
+        b = lexicon.has_content_pos(text, content_pos)
+        if a == b:
+            agree += 1
+        elif len(disagreements) < args.show:
+            disagreements.append(f"  spacy={a!s:5} lexicon={b!s:5} {text!r}")
+        for tok in doc:
+            if tok.is_alpha and len(tok.text) > 2:
+                tok_total += 1
+                tok_agree += lexicon.pos(tok.text) == tok.pos_
+
+    n = max(1, len(lines))
+    print(f"lines: {len(lines)}  verdict agreement: {agree / n:.2%}")
+    print(f"tokens: {tok_total}  POS agreement: {tok_agree / max(1, tok_total):.2%}")
+    if disagreements:
+        print("sample disagreements:")
+        print("\n".join(disagreements))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    ex = sub.add_parser("export", help="Export a word->POS lexicon from a spaCy model.")
+    ex.add_argument("--model", default="en_core_web_sm")
+    ex.add_argument("--corpus", type=Path, default=None, help="Directory of PDFs to tag in context.")
+    ex.add_argument("--no-vocab", dest="vocab", action="store_false", help="Skip the model vocabulary.")
+    ex.add_argument("--context-weight", type=int, default=3)
+    ex.add_argument("--min-count", type=int, default=1)
+    ex.add_argument("--unknown-pos", default="NOUN")
+    ex.add_argument("--max-chars", type=int, default=120)
+    ex.add_argument("--out", type=Path, default=Path("configs/pos_lexicon.bin"))
+    ex.set_defaults(func=cmd_export)
+
+    ag = sub.add_parser("agree", help="Measure lexicon vs spaCy agreement on a PDF corpus.")
+    ag.add_argument("--corpus", type=Path, required=True)
+    ag.add_argument("--lexicon", type=Path, default=Path("configs/pos_lexicon.bin"))
+    ag.add_argument("--config", type=Path, default=Path("configs/task1a.yaml"))
+    ag.add_argument("--show", type=int, default=20, help="Disagreements to print.")
+    ag.set_defaults(func=cmd_agree)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
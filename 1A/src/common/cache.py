@@ -0,0 +1,170 @@
+# src/common/cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+_CHUNK = 1 << 20
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of the file bytes, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def config_digest(cfg_dict: Dict[str, Any]) -> str:
+    """sha256 of a config dict, independent of key order."""
+    blob = json.dumps(cfg_dict, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _json_dump(obj: Dict[str, Any], f: BinaryIO) -> None:
+    f.write(json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+
+def _json_load(f: BinaryIO) -> Dict[str, Any]:
+    return json.loads(f.read().decode("utf-8"))
+
+
+def _pickle_dump(obj: Any, f: BinaryIO) -> None:
+    pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class _DiskLRU:
+    """
+    Content-addressed on-disk store with size-bounded LRU eviction.
+
+    Entries live at <root>/<kk>/<key><suffix>. The file mtime doubles as the LRU
+    clock: hits touch it, and `put` evicts the least recently used entries once
+    the store grows past `max_bytes`. `dump(obj, f)` / `load(f)` serialize
+    entries to and from a binary file.
+    """
+
+    suffix = ""
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int,
+        version: str,
+        dump: Callable[[Any, BinaryIO], None],
+        load: Callable[[BinaryIO], Any],
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.version = version
+        self._dump = dump
+        self._load = load
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._total: Optional[int] = None  # bytes on disk, scanned lazily
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[Any]:
+        p = self._path(key)
+        try:
+            with p.open("rb") as f:
+                obj = self._load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning("Dropping unreadable cache entry %s: %s", p.name, e)
+            p.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        return obj
+
+    def put(self, key: str, obj: Any) -> None:
+        p = self._path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        old_size = p.stat().st_size if p.exists() else 0
+        tmp = p.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            self._dump(obj, f)
+        os.replace(tmp, p)
+
+        if self._total is None:
+            self.evict()
+        else:
+            self._total += p.stat().st_size - old_size
+            if self._total > self.max_bytes:
+                self.evict()
+
+    def evict(self) -> None:
+        """Rescan the store and drop least recently used entries down to max_bytes."""
+        entries = []
+        total = 0
+        for p in self.root.glob(f"*/*{self.suffix}"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        if total <= self.max_bytes:
+            self._total = total
+            return
+        entries.sort(key=lambda e: e[0])
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+        self._total = total
+
+
+class ResultCache(_DiskLRU):
+    """Final JSON outputs, keyed by sha256(pdf bytes, whole config, pipeline version)."""
+
+    suffix = ".json"
+
+    def __init__(self, root: Path, max_bytes: int, version: str):
+        super().__init__(root, max_bytes, version, _json_dump, _json_load)
+
+    def key(self, pdf_path: Path, cfg_digest: str) -> str:
+        h = hashlib.sha256()
+        h.update(file_digest(pdf_path).encode("ascii"))
+        h.update(cfg_digest.encode("ascii"))
+        h.update(self.version.encode("utf-8"))
+        return h.hexdigest()
+
+
+
+class ArtifactCache(_DiskLRU):
+    """
+    Pickled intermediate pipeline artifacts (feature rows, candidates, labels).
+
+    Each stage is keyed by the pdf digest plus only the config sections that can
+    change that stage's output, so tuning a late stage reuses the earlier ones.
+    """
+
+    suffix = ".pkl"
+
+    def __init__(self, root: Path, max_bytes: int, version: str):
+        super().__init__(root, max_bytes, version, _pickle_dump, pickle.load)
+
+    def key(self, pdf_digest: str, stage: str, cfg_sections: Dict[str, Any]) -> str:
+        h = hashlib.sha256()
+        h.update(pdf_digest.encode("ascii"))
+        h.update(stage.encode("utf-8"))
+        h.update(config_digest(cfg_sections).encode("ascii"))
+        h.update(self.version.encode("utf-8"))
+        return h.hexdigest()
+
+
+__all__ = ["ResultCache", "ArtifactCache", "file_digest", "config_digest"]
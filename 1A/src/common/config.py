@@ -12,6 +12,13 @@ import yaml
 @dataclass
 class TimingConfig:
     hard_timeout_seconds: int = 10
+    # anytime mode: aim to answer within budget_fraction * hard_timeout_seconds,
+    # scanning pages in priority order and skipping optional stages when short
+    anytime: bool = True
+    budget_fraction: float = 0.8
+    front_pages: int = 5
+    finish_reserve_seconds: float = 1.0
+    optional_min_seconds: float = 0.5
 
 @dataclass
 class TaggedConfig:
@@ -25,6 +32,28 @@ class FilteringConfig:
     # (optional) when you want to drop tiny 1-word shards
     min_chars_single_word: int = 4
 
+@dataclass
+class OutputConfig:
+    include_coordinates: bool = False  # add "bbox" [x0, y0, x1, y1] to every outline entry
+
+@dataclass
+class ExtractionConfig:
+    preserve_ligatures: bool = True
+    preserve_whitespace: bool = True
+    dehyphenate: bool = False
+
+@dataclass
+class ShardingConfig:
+    workers: int = 0          # 0/1 disables intra-document page sharding
+    min_pages: int = 200      # only shard documents at least this long
+    min_pages_per_shard: int = 25
+
+@dataclass
+class StreamingConfig:
+    enable: bool = True
+    min_pages: int = 1000     # stream documents at least this long (bounded memory)
+    pages_per_chunk: int = 64
+
 @dataclass
 class BodyProfileConfig:
     sample_pages: int = 3
@@ -165,6 +194,10 @@ class SemanticFilterConfig:
     accept_all_caps_minlen: int = 2
     require_content_pos: bool = True
     content_pos: List[str] = field(default_factory=lambda: ["NOUN", "PROPN", "VERB", "ADJ"])
+    batch_size: int = 256         # nlp.pipe batch size
+    cache_size: int = 50000       # per-process text -> verdict LRU entries
+    use_lexicon: bool = False     # spaCy-free POS lookup; takes precedence over use_spacy
+    lexicon_path: str = "configs/pos_lexicon.bin"  # load_config resolves it against the config file
 
 @dataclass
 class Task1AConfig:
@@ -184,6 +217,10 @@ class Task1AConfig:
     context: ContextConfig = field(default_factory=ContextConfig)
     recipe: RecipeConfig = field(default_factory=RecipeConfig)
     semantic_filter: SemanticFilterConfig = field(default_factory=SemanticFilterConfig)
+    extraction: ExtractionConfig = field(default_factory=ExtractionConfig)
+    sharding: ShardingConfig = field(default_factory=ShardingConfig)
+    streaming: StreamingConfig = field(default_factory=StreamingConfig)
+    output: OutputConfig = field(default_factory=OutputConfig)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -216,6 +253,10 @@ class Task1AConfig:
                 **self.semantic_filter.__dict__,
                 "content_pos": list(self.semantic_filter.content_pos),
             },
+            "extraction": self.extraction.__dict__,
+            "sharding": self.sharding.__dict__,
+            "streaming": self.streaming.__dict__,
+            "output": self.output.__dict__,
         }
 
 # -------------------------
@@ -331,6 +372,37 @@ def load_config(path: Path | str) -> Task1AConfig:
         accept_all_caps_minlen=sf_data.get("accept_all_caps_minlen", 2),
         require_content_pos=sf_data.get("require_content_pos", True),
         content_pos=sf_data.get("content_pos", ["NOUN", "PROPN", "VERB", "ADJ"]),
+        batch_size=sf_data.get("batch_size", 256),
+        cache_size=sf_data.get("cache_size", 50000),
+        use_lexicon=sf_data.get("use_lexicon", False),
+        # relative to the config file, not to the working directory
+        lexicon_path=str(Path(path).resolve().parent / sf_data.get("lexicon_path", "pos_lexicon.bin")),
+    )
+
+    out_data = data.get("output", {})
+    output = OutputConfig(
+        include_coordinates=out_data.get("include_coordinates", False),
+    )
+
+    ex_data = data.get("extraction", {})
+    extraction = ExtractionConfig(
+        preserve_ligatures=ex_data.get("preserve_ligatures", True),
+        preserve_whitespace=ex_data.get("preserve_whitespace", True),
+        dehyphenate=ex_data.get("dehyphenate", False),
+    )
+
+    sh_data = data.get("sharding", {})
+    sharding = ShardingConfig(
+        workers=sh_data.get("workers", 0),
+        min_pages=sh_data.get("min_pages", 200),
+        min_pages_per_shard=sh_data.get("min_pages_per_shard", 25),
+    )
+
+    st_data = data.get("streaming", {})
+    streaming = StreamingConfig(
+        enable=st_data.get("enable", True),
+        min_pages=st_data.get("min_pages", 1000),
+        pages_per_chunk=st_data.get("pages_per_chunk", 64),
     )
 
     return Task1AConfig(
@@ -350,4 +422,8 @@ def load_config(path: Path | str) -> Task1AConfig:
         context=context,
         recipe=recipe,
         semantic_filter=semantic_filter,
+        extraction=extraction,
+        sharding=sharding,
+        streaming=streaming,
+        output=output,
     )
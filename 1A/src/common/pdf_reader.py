@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator, List, Optional, Tuple, Dict
+from typing import Iterable, Iterator, List, Optional, Tuple, Dict
 import logging
 import statistics
 from collections import defaultdict
@@ -12,6 +12,10 @@ import fitz  # PyMuPDF
 
 log = logging.getLogger(__name__)
 
+# Text-only extraction: like fitz.TEXTFLAGS_DICT but without TEXT_PRESERVE_IMAGES,
+# so image blocks (and their raw bytes) are never built.
+_BASE_TEXT_FLAGS = fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_CID_FOR_UNKNOWN_UNICODE
+
 
 @dataclass
 class Span:
@@ -92,6 +96,25 @@ def get_toc(doc: fitz.Document) -> List[Tuple[int, str, int]]:
     return toc_zero
 
 
+def get_toc_points(doc: fitz.Document) -> List[Optional[Tuple[float, float]]]:
+    """
+    Link destination point (x, y) of each TOC entry, aligned with `get_toc`.
+    PyMuPDF reports it in page coordinates (top-left origin); None when the
+    entry has no usable GOTO target.
+    """
+    try:
+        raw = doc.get_toc(simple=False) or []
+    except Exception as e:
+        log.warning("Unable to read TOC destinations: %s", e)
+        return []
+    points: List[Optional[Tuple[float, float]]] = []
+    for entry in raw:
+        dest = entry[3] if len(entry) > 3 and isinstance(entry[3], dict) else {}
+        to = dest.get("to") if dest.get("kind") == fitz.LINK_GOTO else None
+        points.append((float(to.x), float(to.y)) if to is not None else None)
+    return points
+
+
 def get_pages_info(doc: fitz.Document) -> List[PageInfo]:
     infos: List[PageInfo] = []
     for i, page in enumerate(doc):
@@ -125,9 +148,34 @@ def get_page_number_map(doc: fitz.Document) -> List[int]:
     return nums
 
 
-def iter_page_lines(doc: fitz.Document, page_index: int) -> Iterator[Line]:
+def text_flags(
+    preserve_ligatures: bool = True,
+    preserve_whitespace: bool = True,
+    dehyphenate: bool = False,
+) -> int:
+    """
+    Build the `get_text` flags for line extraction. Image payloads are always excluded.
+    """
+    flags = _BASE_TEXT_FLAGS
+    if preserve_ligatures:
+        flags |= fitz.TEXT_PRESERVE_LIGATURES
+    if preserve_whitespace:
+        flags |= fitz.TEXT_PRESERVE_WHITESPACE
+    if dehyphenate:
+        flags |= fitz.TEXT_DEHYPHENATE
+    return flags
+
+
+TEXT_FLAGS_DEFAULT = text_flags()
+
+
+def iter_page_lines(
+    doc: fitz.Document,
+    page_index: int,
+    flags: int = TEXT_FLAGS_DEFAULT,
+) -> Iterator[Line]:
     page = doc[page_index]
-    text_dict = page.get_text("dict")
+    text_dict = page.get_text("dict", flags=flags)
 
     for block in text_dict.get("blocks", []):
         if block.get("type", 0) != 0:
@@ -153,17 +201,76 @@ def iter_page_lines(doc: fitz.Document, page_index: int) -> Iterator[Line]:
                 yield Line(text=text_line, bbox=bbox, spans=spans)
 
 
+class DocumentLayout:
+    """
+    Per-document cache of extracted page layout.
+
+    Each page is run through `get_text` at most once; the resulting Line/Span
+    objects are kept and shared by every stage (body profile, features,
+    page-number map, TOC) for the lifetime of the open document, unless the
+    caller drops them with `forget` (streaming mode).
+    """
+
+    def __init__(self, doc: fitz.Document, flags: int = TEXT_FLAGS_DEFAULT):
+        self.doc = doc
+        self.flags = flags
+        self._lines: Dict[int, List[Line]] = {}
+        self._pages_info: Optional[List[PageInfo]] = None
+        self._page_number_map: Optional[List[int]] = None
+        self._toc: Optional[List[Tuple[int, str, int]]] = None
+        self._toc_points: Optional[List[Optional[Tuple[float, float]]]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc)
+
+    def page_lines(self, page_index: int) -> List[Line]:
+        lines = self._lines.get(page_index)
+        if lines is None:
+            lines = list(iter_page_lines(self.doc, page_index, self.flags))
+            self._lines[page_index] = lines
+        return lines
+
+    def forget(self, page_indices: Iterable[int]) -> None:
+        """Drop cached lines of these pages; they are re-extracted if asked for again."""
+        for i in page_indices:
+            self._lines.pop(i, None)
+
+    @property
+    def pages_info(self) -> List[PageInfo]:
+        if self._pages_info is None:
+            self._pages_info = get_pages_info(self.doc)
+        return self._pages_info
+
+    @property
+    def page_number_map(self) -> List[int]:
+        if self._page_number_map is None:
+            self._page_number_map = get_page_number_map(self.doc)
+        return self._page_number_map
+
+    @property
+    def toc(self) -> List[Tuple[int, str, int]]:
+        if self._toc is None:
+            self._toc = get_toc(self.doc)
+        return self._toc
+
+    @property
+    def toc_points(self) -> List[Optional[Tuple[float, float]]]:
+        if self._toc_points is None:
+            self._toc_points = get_toc_points(self.doc)
+        return self._toc_points
+
+
 def infer_body_font_profile(
-    doc: fitz.Document,
+    layout: DocumentLayout,
     sample_pages: int = 3,
     use_median_font_size: bool = False,
 ) -> BodyFontProfile:
     size_weights: Dict[float, int] = defaultdict(int)
     font_weights: Dict[str, int] = defaultdict(int)
     all_sizes: List[float] = []
-    pages_to_scan = min(len(doc), max(1, sample_pages))
+    pages_to_scan = min(len(layout), max(1, sample_pages))
     for page_idx in range(pages_to_scan):
-        for _, line in [(page_idx, l) for l in iter_page_lines(doc, page_idx)]:
+        for line in layout.page_lines(page_idx):
             for span in line.spans:
                 w = len(span.text)
                 size_weights[span.size] += w
@@ -215,10 +322,14 @@ __all__ = [
     "Line",
     "PageInfo",
     "BodyFontProfile",
+    "DocumentLayout",
     "open_document",
     "get_toc",
+    "get_toc_points",
     "get_pages_info",
     "get_page_number_map",
+    "text_flags",
+    "TEXT_FLAGS_DEFAULT",
     "iter_page_lines",
     "infer_body_font_profile",
     "is_bold_span",
@@ -0,0 +1,148 @@
+# src/common/timing.py
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StageTimer:
+    """
+    Wall-clock time per pipeline stage plus simple counters.
+
+        timer = StageTimer()
+        with timer.stage("features"):
+            ...
+        timer.count("lines", n)
+
+    Re-entering a stage accumulates; `as_dict()` is JSON- and pickle-friendly so
+    it can travel back from worker processes.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (perf_counter() - start)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class Deadline:
+    """
+    Wall-clock budget counted from construction; `seconds=None` never expires.
+
+        deadline = Deadline(8.0)
+        if deadline.allows(0.5):
+            ...optional work...
+    """
+
+    def __init__(self, seconds: Optional[float]):
+        self.seconds = seconds
+        self._end = None if seconds is None else perf_counter() + seconds
+
+    def remaining(self) -> float:
+        if self._end is None:
+            return float("inf")
+        return self._end - perf_counter()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def allows(self, seconds: float) -> bool:
+        return self.remaining() >= seconds
+
+
+class MetricsSink:
+    """
+    Collects one record per document and writes them as JSON lines (appended
+    as they arrive) or as a Prometheus text-format snapshot on `close()`.
+    """
+
+    def __init__(self, path: Path, fmt: str = "jsonl"):
+        if fmt not in ("jsonl", "prom"):
+            raise ValueError(f"unknown metrics format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._jsonl = self.path.open("a", encoding="utf-8") if fmt == "jsonl" else None
+
+        self._stage_sum: Dict[str, float] = defaultdict(float)
+        self._stage_count: Dict[str, int] = defaultdict(int)
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._docs: Dict[str, int] = defaultdict(int)
+        self._doc_seconds = 0.0
+
+    def record(
+        self,
+        file: str,
+        status: str,
+        elapsed: float,
+        metrics: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        metrics = metrics or {"stages": {}, "counters": {}}
+        self._docs[status] += 1
+        self._doc_seconds += elapsed
+        for k, v in metrics.get("stages", {}).items():
+            self._stage_sum[k] += v
+            self._stage_count[k] += 1
+        for k, v in metrics.get("counters", {}).items():
+            self._counters[k] += v
+
+        if self._jsonl is not None:
+            rec = {"file": file, "status": status, "seconds": round(elapsed, 6), **metrics}
+            self._jsonl.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+
+    def close(self) -> None:
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+            return
+        if self.fmt == "prom":
+            self.path.write_text(self._prometheus(), encoding="utf-8")
+
+    def _prometheus(self) -> str:
+        lines: List[str] = [
+            "# HELP task1a_documents_total Documents by final status.",
+            "# TYPE task1a_documents_total counter",
+        ]
+        for status, n in sorted(self._docs.items()):
+            lines.append(f'task1a_documents_total{{status="{status}"}} {n}')
+        lines += [
+            "# HELP task1a_document_seconds Wall time spent per document.",
+            "# TYPE task1a_document_seconds summary",
+            f"task1a_document_seconds_sum {self._doc_seconds:.6f}",
+            f"task1a_document_seconds_count {sum(self._docs.values())}",
+            "# HELP task1a_stage_seconds Wall time per pipeline stage.",
+            "# TYPE task1a_stage_seconds summary",
+        ]
+        for stage in sorted(self._stage_sum):
+            lines.append(f'task1a_stage_seconds_sum{{stage="{stage}"}} {self._stage_sum[stage]:.6f}')
+            lines.append(f'task1a_stage_seconds_count{{stage="{stage}"}} {self._stage_count[stage]}')
+        lines += [
+            "# HELP task1a_items_total Items seen by the pipeline (pages, lines, candidates, headings).",
+            "# TYPE task1a_items_total counter",
+        ]
+        for name, n in sorted(self._counters.items()):
+            lines.append(f'task1a_items_total{{kind="{name}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+__all__ = ["StageTimer", "Deadline", "MetricsSink"]
@@ -17,7 +17,10 @@ from src.common import io as io_utils
 
 # You will implement this:
 #   - src/task1a/pipeline.py:run_pipeline(pdf_path: Path, cfg: Task1AConfig) -> dict
-from src.task1a.pipeline import run_pipeline
+from src.task1a.pipeline import run_pipeline, PIPELINE_VERSION
+from src.task1a.batch import run_batch
+from src.common.cache import ResultCache, ArtifactCache, config_digest
+from src.common.timing import StageTimer, MetricsSink
 
 
 def parse_args() -> argparse.Namespace:
@@ -48,6 +51,58 @@ def parse_args() -> argparse.Namespace:
         choices=("DEBUG", "INFO", "WARNING", "ERROR"),
         help="Logging level.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes; each file is hard-killed after timing.hard_timeout_seconds. "
+        "0 runs in-process, where the timeout is only logged.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path.home() / ".cache" / "task1a",
+        help="Directory of the content-addressed result cache.",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        help="Size bound of the result cache; least recently used entries are evicted.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the result cache.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached results, recompute and overwrite them.",
+    )
+    parser.add_argument(
+        "--stage-cache",
+        action="store_true",
+        help="Also memoize features/candidates/labels per config section (for config tuning).",
+    )
+    parser.add_argument(
+        "--stage-cache-max-mb",
+        type=int,
+        default=2048,
+        help="Size bound of the stage cache.",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        default=None,
+        help="Write per-stage timings and counters to this file.",
+    )
+    parser.add_argument(
+        "--metrics-format",
+        default="jsonl",
+        choices=("jsonl", "prom"),
+        help="jsonl: one record per document; prom: Prometheus text-format snapshot.",
+    )
     return parser.parse_args()
 
 
@@ -74,43 +129,126 @@ def main() -> int:
     overall_start = perf_counter()
     processed = 0
     failed = 0
-
-    for pdf_path in pdf_paths:
-        start = perf_counter()
-        try:
-            log.info("Processing: %s", pdf_path.name)
-            result = run_pipeline(pdf_path, cfg)  # expected to return dict with {title, outline: [...]}
-
-            out_name = f"{io_utils.safe_stem(pdf_path)}.json"
-            out_path = output_dir / out_name
-            io_utils.write_json(result, out_path)
-
-            elapsed = perf_counter() - start
+    timed_out = 0
+    cached = 0
+
+    cache = None
+    cache_keys: dict = {}
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024, PIPELINE_VERSION)
+        cfg_hash = config_digest(cfg.to_dict())
+
+    artifacts = None
+    artifact_dir = args.cache_dir / "stages"
+    artifact_max_bytes = args.stage_cache_max_mb * 1024 * 1024
+    if args.stage_cache and not args.no_cache:
+        artifacts = ArtifactCache(artifact_dir, artifact_max_bytes, PIPELINE_VERSION)
+
+    sink = MetricsSink(args.metrics, args.metrics_format) if args.metrics else None
+
+    def _write_result(pdf_path: Path, result: dict, elapsed: float, metrics: dict | None = None) -> None:
+        out_name = f"{io_utils.safe_stem(pdf_path)}.json"
+        out_path = output_dir / out_name
+        write_start = perf_counter()
+        io_utils.write_json(result, out_path)
+        partial = bool(result.get("partial"))
+        if partial:
+            log.warning("Partial: %s in %.3fs -> %s (deadline reached)", pdf_path.name, elapsed, out_path.name)
+        else:
             log.info("Done: %s in %.3fs -> %s", pdf_path.name, elapsed, out_path.name)
+        key = cache_keys.get(pdf_path)
+        if cache is not None and key is not None and not partial:
+            cache.put(key, result)
+        if sink is not None:
+            metrics = metrics or {"stages": {}, "counters": {}}
+            stages = metrics["stages"]
+            # the parent's JSON write; the worker's own "write" stage is output assembly
+            stages["result_write"] = round(perf_counter() - write_start, 6)
+            sink.record(pdf_path.name, "partial" if partial else "ok", elapsed, metrics)
+
+    if cache is not None:
+        misses = []
+        for pdf_path in pdf_paths:
+            try:
+                key = cache.key(pdf_path, cfg_hash)
+            except OSError as e:
+                log.warning("Cannot hash %s for the result cache: %s", pdf_path.name, e)
+                misses.append(pdf_path)
+                continue
+            cache_keys[pdf_path] = key
+            hit = None if args.refresh else cache.get(key)
+            if hit is None:
+                misses.append(pdf_path)
+                continue
+            out_path = output_dir / f"{io_utils.safe_stem(pdf_path)}.json"
+            io_utils.write_json(hit, out_path)
+            log.info("Cached: %s -> %s", pdf_path.name, out_path.name)
             processed += 1
-
-            # Soft timing assertion (log-only). Hard-kill would be handled outside by orchestrator if needed.
-            if elapsed > cfg.timing.hard_timeout_seconds:
-                log.warning(
-                    "⚠️ File %s exceeded hard_timeout_seconds (%.2fs > %ds)",
-                    pdf_path.name,
-                    elapsed,
-                    cfg.timing.hard_timeout_seconds,
-                )
-
-        except Exception as e:
-            failed += 1
-            log.exception("Failed processing %s: %s", pdf_path.name, e)
+            cached += 1
+            if sink is not None:
+                sink.record(pdf_path.name, "cached", 0.0)
+        pdf_paths = misses
+
+    if args.workers >= 1:
+        report = run_batch(
+            pdf_paths,
+            args.config,
+            cfg,
+            args.workers,
+            _write_result,
+            artifact_dir=artifact_dir if artifacts is not None else None,
+            artifact_max_bytes=artifact_max_bytes,
+        )
+        processed += report.processed
+        failed = len(report.failed)
+        timed_out = len(report.timed_out)
+        for p in report.timed_out:
+            log.warning("⚠️ Timed out (killed): %s", p)
+        if sink is not None:
+            for p in report.failed:
+                sink.record(p.name, "failed", 0.0)
+            for p in report.timed_out:
+                sink.record(p.name, "timed_out", float(cfg.timing.hard_timeout_seconds))
+    else:
+        for pdf_path in pdf_paths:
+            start = perf_counter()
+            timer = StageTimer()
+            try:
+                log.info("Processing: %s", pdf_path.name)
+                result = run_pipeline(pdf_path, cfg, artifacts, timer)  # expected to return dict with {title, outline: [...]}
+                elapsed = perf_counter() - start
+                _write_result(pdf_path, result, elapsed, timer.as_dict())
+                processed += 1
+
+                # Soft timing assertion (log-only). Use --workers N >= 1 for a hard kill.
+                if elapsed > cfg.timing.hard_timeout_seconds:
+                    log.warning(
+                        "⚠️ File %s exceeded hard_timeout_seconds (%.2fs > %ds)",
+                        pdf_path.name,
+                        elapsed,
+                        cfg.timing.hard_timeout_seconds,
+                    )
+
+            except Exception as e:
+                failed += 1
+                log.exception("Failed processing %s: %s", pdf_path.name, e)
+                if sink is not None:
+                    sink.record(pdf_path.name, "failed", perf_counter() - start, timer.as_dict())
+
+    if sink is not None:
+        sink.close()
 
     total_elapsed = perf_counter() - overall_start
     log.info(
-        "Finished. processed=%d failed=%d total_time=%.3fs",
+        "Finished. processed=%d cached=%d failed=%d timed_out=%d total_time=%.3fs",
         processed,
+        cached,
         failed,
+        timed_out,
         total_elapsed,
     )
 
-    return 0 if failed == 0 else 2
+    return 0 if failed == 0 and timed_out == 0 else 2
 
 
 if __name__ == "__main__":
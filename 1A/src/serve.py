@@ -0,0 +1,305 @@
+# src/serve.py
+"""
+Long-running Task 1A service: keeps the config and POS model warm in a pool of
+killable worker processes and answers outline requests over localhost HTTP.
+
+    python -m src.serve --config configs/task1a.yaml --port 8765 --workers 4
+
+    POST /outline   {"path": "/abs/file.pdf"}      -> {"title": ..., "outline": [...]}
+    POST /outline   <raw PDF bytes> (application/pdf)
+    GET  /healthz
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Optional, Tuple
+
+from src.common.config import load_config, Task1AConfig
+from src.task1a.batch import Worker
+
+log = logging.getLogger("task1a.serve")
+
+
+# -------------------------
+# Service
+# -------------------------
+
+class OutlineService:
+    """
+    Killable worker processes + bounded admission + config hot-reload.
+
+    Each request checks out one idle worker (a `batch.Worker`: one process,
+    config and POS model loaded once) and waits at most hard_timeout_seconds
+    for its answer. A worker that overruns is killed and joined before the
+    request returns, then replaced, so a pathological PDF can never pin a
+    worker. At most `queue_size` requests are admitted (running or waiting);
+    further requests are rejected immediately rather than piling up. A worker
+    that is not ready within `startup_timeout` seconds is killed. When the
+    config file's mtime changes and it still loads, workers started on the old
+    config are replaced as they come back to the idle pool.
+    """
+
+    def __init__(self, config_path: Path, workers: int, queue_size: int, startup_timeout: float):
+        self.config_path = config_path
+        self.startup_timeout = startup_timeout
+        self._cfg_lock = threading.Lock()
+        self._cfg_mtime = config_path.stat().st_mtime
+        self.cfg = load_config(config_path)
+        self._generation = 0
+        self._slots = threading.BoundedSemaphore(max(1, queue_size))
+        self._ctx = mp.get_context()
+        self._idle: "queue.Queue[Tuple[int, Worker]]" = queue.Queue()
+        # spawn and warm every worker before the first request arrives
+        started = [self._start_worker() for _ in range(max(1, workers))]
+        try:
+            for w in started:
+                self._idle.put((0, self._await_ready(w)))
+        except Exception:
+            for w in started:
+                if w.proc.is_alive():
+                    w.kill()
+            raise
+
+    def _start_worker(self) -> Worker:
+        # no artifact cache; the worker loads the config (and POS model) itself
+        return Worker(self._ctx, (str(self.config_path), None, 0))
+
+    def _await_ready(self, w: Worker) -> Worker:
+        """Wait for `w` to finish warm-up; a worker that hangs or dies is killed."""
+        try:
+            if not w.conn.poll(self.startup_timeout):
+                raise RuntimeError(f"worker not ready after {self.startup_timeout:g}s")
+            status, *_ = w.conn.recv()
+        except (EOFError, OSError) as e:
+            status = f"died during warm-up ({e or type(e).__name__})"
+        except RuntimeError:
+            w.kill()
+            raise
+        if status != "ready":
+            w.kill()
+            raise RuntimeError(f"worker failed to start: {status}")
+        return w
+
+    def _respawn(self, old: Worker) -> Tuple[int, Worker]:
+        """
+        Kill `old` (if still running) and start a warm replacement. If that fails
+        or times out, hand back the dead worker tagged stale so the next checkout
+        retries.
+        """
+        if old.proc.is_alive():
+            old.kill()
+        else:
+            old.proc.join()
+            old.conn.close()
+        generation = self._generation
+        try:
+            return generation, self._await_ready(self._start_worker())
+        except Exception as e:
+            log.error("Could not start a replacement worker: %s", e)
+            return -1, old
+
+    def current_config(self) -> Task1AConfig:
+        with self._cfg_lock:
+            try:
+                mtime = self.config_path.stat().st_mtime
+            except OSError:
+                return self.cfg
+            if mtime != self._cfg_mtime:
+                try:
+                    self.cfg = load_config(self.config_path)
+                    self._cfg_mtime = mtime
+                    self._generation += 1
+                    log.info("Reloaded config from %s", self.config_path)
+                except Exception as e:
+                    log.error("Config reload failed, keeping previous config: %s", e)
+            return self.cfg
+
+    def outline(self, pdf_path: Path) -> Tuple[int, Dict[str, Any]]:
+        """
+        Run one PDF on an idle worker. Returns only once that worker has answered
+        or has been killed, so the caller may delete `pdf_path` afterwards.
+        """
+        if not self._slots.acquire(blocking=False):
+            return 503, {"error": "queue full"}
+        try:
+            cfg = self.current_config()
+            timeout = float(cfg.timing.hard_timeout_seconds)
+            generation, w = self._idle.get()
+            try:
+                if generation != self._generation or not w.proc.is_alive():
+                    if w.proc.is_alive():
+                        w.stop()  # idle on an old config: let it exit cleanly
+                    generation, w = self._respawn(w)
+                    if generation < 0:
+                        return 503, {"error": "no worker available"}
+
+                w.submit(pdf_path)
+                try:
+                    if not w.conn.poll(timeout):
+                        # kill() joins: the process is gone before we return
+                        generation, w = self._respawn(w)
+                        return 504, {"error": f"exceeded hard_timeout_seconds={cfg.timing.hard_timeout_seconds}"}
+                    status, payload, _elapsed, _metrics = w.conn.recv()
+                except (EOFError, OSError) as e:
+                    log.error("Worker died while processing %s: %s", pdf_path, e)
+                    generation, w = self._respawn(w)
+                    return 500, {"error": "worker died"}
+            finally:
+                w.task = None
+                self._idle.put((generation, w))
+
+            if status == "ok":
+                return 200, payload
+            log.error("Failed processing %s: %s", pdf_path, payload)
+            return 500, {"error": payload}
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                _, w = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            w.stop()
+        for proc in mp.active_children():  # workers still busy with a request
+            proc.kill()
+            proc.join()
+
+
+def _make_handler(service: OutlineService, max_body: int):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, obj: Dict[str, Any]) -> None:
+            body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path == "/healthz":
+                self._reply(200, {"status": "ok"})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            if self.path != "/outline":
+                self._reply(404, {"error": "not found"})
+                return
+            start = perf_counter()
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._reply(400, {"error": "bad Content-Length"})
+                return
+            if length > max_body:
+                self._reply(413, {"error": f"body exceeds {max_body} bytes"})
+                return
+            body = self.rfile.read(length) if length else b""
+            ctype = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+
+            tmp_path: Optional[str] = None
+            try:
+                if ctype == "application/json":
+                    try:
+                        pdf_path = Path(json.loads(body or b"{}")["path"])
+                    except (ValueError, KeyError, TypeError):
+                        self._reply(400, {"error": 'expected JSON body {"path": ...}'})
+                        return
+                    if not pdf_path.is_file():
+                        self._reply(404, {"error": f"no such file: {pdf_path}"})
+                        return
+                else:
+                    if not body:
+                        self._reply(400, {"error": "empty body"})
+                        return
+                    fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(body)
+                    pdf_path = Path(tmp_path)
+
+                status, result = service.outline(pdf_path)
+                self._reply(status, result)
+                log.info("%s %d in %.3fs", pdf_path.name, status, perf_counter() - start)
+            finally:
+                if tmp_path is not None:
+                    os.unlink(tmp_path)
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            log.debug(fmt, *args)
+
+    return Handler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Task 1A: outline extraction service.")
+    parser.add_argument("--config", type=Path, default=Path("configs/task1a.yaml"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=64,
+        help="Max requests admitted at once (running + waiting); more get HTTP 503.",
+    )
+    parser.add_argument(
+        "--max-body",
+        type=int,
+        default=64 << 20,
+        help="Largest request body in bytes; larger requests get HTTP 413.",
+    )
+    parser.add_argument(
+        "--startup-timeout",
+        type=float,
+        default=120.0,
+        help="Seconds a worker may take to load the config and POS model.",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format="%(asctime)s | %(levelname)s | %(message)s",
+    )
+
+    # SIGTERM (e.g. docker stop) takes the same clean path as Ctrl-C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    service = OutlineService(args.config, args.workers, args.queue_size, args.startup_timeout)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(service, args.max_body))
+    server.daemon_threads = True
+    log.info("Serving on http://%s:%d with %d workers", args.host, args.port, args.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# src/task1a/batch.py
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.common.config import load_config, Task1AConfig
+
+log = logging.getLogger(__name__)
+
+# Called in the parent for every finished document:
+# (pdf_path, result, elapsed_seconds, StageTimer.as_dict() from the worker)
+ResultCallback = Callable[[Path, Dict[str, Any], float, Dict[str, Any]], None]
+
+
+@dataclass
+class BatchReport:
+    processed: int = 0
+    failed: List[Path] = field(default_factory=list)
+    timed_out: List[Path] = field(default_factory=list)
+
+
+# -------------------------
+# Worker side
+# -------------------------
+
+def _worker_main(
+    conn: Connection,
+    config_path: str,
+    artifact_dir: Optional[str],
+    artifact_max_bytes: int,
+) -> None:
+    """
+    Worker loop: load config + POS backend once, then run one PDF per message until
+    the parent sends None.
+    """
+    # imported here rather than at module level so `batch` itself stays cheap to
+    # import; under the fork start method the worker inherits them from the parent
+    from src.task1a.pipeline import run_pipeline, PIPELINE_VERSION
+    from src.task1a import semantic_filter
+    from src.common.cache import ArtifactCache
+    from src.common.timing import StageTimer
+
+    cfg = load_config(config_path)
+    # batch workers are daemonic and already use every core: no nested page shards
+    cfg.sharding.workers = 0
+    artifacts = None
+    if artifact_dir is not None:
+        artifacts = ArtifactCache(Path(artifact_dir), artifact_max_bytes, PIPELINE_VERSION)
+    semantic_filter.warm_up(cfg.semantic_filter)
+    # warm-up is done: the parent restarts the clock for the first document
+    conn.send(("ready", None, 0.0, None))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg is None:
+            return
+        pdf_path = Path(msg)
+        start = perf_counter()
+        timer = StageTimer()
+        try:
+            result = run_pipeline(pdf_path, cfg, artifacts, timer)
+            conn.send(("ok", result, perf_counter() - start, timer.as_dict()))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}", perf_counter() - start, timer.as_dict()))
+
+
+# -------------------------
+# Parent side
+# -------------------------
+
+class Worker:
+    """
+    One `_worker_main` process and the parent's end of its pipe. It sends
+    ("ready", None, 0.0, None) once warm, then one (status, payload, elapsed,
+    metrics) message per submitted PDF. Used by run_batch and src.serve.
+    """
+
+    def __init__(self, ctx, args: tuple):
+        self.conn, child_conn = ctx.Pipe()
+        self.proc = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, *args),
+            daemon=True,
+        )
+        self.proc.start()
+        child_conn.close()
+        self.task: Optional[Path] = None
+        self.started: float = 0.0
+
+    def submit(self, pdf_path: Path) -> None:
+        self.task = pdf_path
+        self.started = perf_counter()
+        self.conn.send(str(pdf_path))
+
+    def kill(self) -> None:
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+        self.conn.close()
+
+
+def run_batch(
+    pdf_paths: Iterable[Path],
+    config_path: Path,
+    cfg: Task1AConfig,
+    workers: int,
+    on_result: ResultCallback,
+    artifact_dir: Optional[Path] = None,
+    artifact_max_bytes: int = 0,
+) -> BatchReport:
+    """
+    Run `run_pipeline` over pdf_paths in `workers` processes.
+
+    Each document gets a hard wall-clock budget of cfg.timing.hard_timeout_seconds:
+    a worker that exceeds it is killed and replaced, the document is recorded in
+    `timed_out`, and the batch keeps going. With `artifact_dir`, workers share an
+    on-disk stage cache (see pipeline.run_pipeline).
+    """
+    ctx = mp.get_context()
+    timeout = float(cfg.timing.hard_timeout_seconds)
+    pending: List[Path] = list(pdf_paths)
+    pending.reverse()  # pop() from the end keeps input order
+    report = BatchReport()
+    if not pending:
+        return report
+
+    worker_args = (
+        str(config_path),
+        str(artifact_dir) if artifact_dir is not None else None,
+        artifact_max_bytes,
+    )
+    pool = [Worker(ctx, worker_args) for _ in range(max(1, min(workers, len(pending))))]
+
+    def _feed(w: Worker) -> None:
+        if pending:
+            pdf_path = pending.pop()
+            log.info("Processing: %s", pdf_path.name)
+            w.submit(pdf_path)
+
+    def _replace(i: int) -> None:
+        pool[i].kill()
+        pool[i].task = None
+        if pending:
+            pool[i] = Worker(ctx, worker_args)
+            _feed(pool[i])
+
+    try:
+        for w in pool:
+            _feed(w)
+
+        while True:
+            busy = [w for w in pool if w.task is not None]
+            if not busy:
+                break
+
+            now = perf_counter()
+            next_deadline = min(w.started + timeout for w in busy)
+            ready = wait([w.conn for w in busy], timeout=max(0.0, next_deadline - now))
+
+            for i, w in enumerate(pool):
+                if w.task is None:
+                    continue
+                pdf_path = w.task
+
+                if w.conn in ready:
+                    try:
+                        status, payload, elapsed, metrics = w.conn.recv()
+                    except EOFError:
+                        log.error("Worker died while processing %s", pdf_path.name)
+                        report.failed.append(pdf_path)
+                        _replace(i)
+                        continue
+
+                    if status == "ready":
+                        w.started = perf_counter()
+                        continue
+
+                    w.task = None
+                    if status == "ok":
+                        try:
+                            on_result(pdf_path, payload, elapsed, metrics)
+                            report.processed += 1
+                        except Exception as e:
+                            report.failed.append(pdf_path)
+                            log.exception("Failed writing %s: %s", pdf_path.name, e)
+                    else:
+                        report.failed.append(pdf_path)
+                        log.error("Failed processing %s: %s", pdf_path.name, payload)
+                    _feed(w)
+
+                elif perf_counter() - w.started >= timeout:
+                    log.error(
+                        "⏱️ Killed %s after hard_timeout_seconds=%ds",
+                        pdf_path.name,
+                        cfg.timing.hard_timeout_seconds,
+                    )
+                    report.timed_out.append(pdf_path)
+                    _replace(i)
+    finally:
+        for w in pool:
+            if w.task is None and w.proc.is_alive():
+                w.stop()
+            elif w.proc.is_alive():
+                w.kill()
+
+    return report
+
+
+__all__ = ["BatchReport", "Worker", "run_batch"]
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import re
-import statistics
 from dataclasses import dataclass
-from typing import List, Tuple
-import fitz
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
 
 from src.common.config import Task1AConfig
 from src.common import pdf_reader as pr
@@ -46,136 +46,219 @@ class FeatureRow:
     page_width: float
     page_height: float
 
+# Columns of a FeatureTable, in FeatureRow field order (bbox is stored as x0/y0/x1/y1).
+_INT_COLUMNS = (
+    "page_index0", "page_num1", "has_numeric_prefix", "word_count", "char_count",
+    "ends_with_colon", "ends_with_period",
+)
+_BOOL_COLUMNS = ("is_bold_majority",)
+_FLOAT_COLUMNS = (
+    "x0", "y0", "x1", "y1",
+    "line_font_size", "y_position", "width_ratio", "vertical_gap", "gap_below",
+    "gap_above_z", "gap_below_z", "font_size_ratio", "center_deviation", "size_vs_prev",
+    "page_top_distance", "title_case_ratio", "uppercase_ratio", "page_width", "page_height",
+)
+_ROW_FIELDS = [f for f in FeatureRow.__dataclass_fields__ if f not in ("text", "bbox")]
+
+
+class FeatureTable:
+    """
+    Columnar feature store: one NumPy array per FeatureRow field, one entry per line.
+
+    `table["font_size_ratio"]` returns a column; iterating yields FeatureRow views
+    for code that still works row by row.
+    """
+
+    def __init__(self, text: List[str], cols: Dict[str, np.ndarray]):
+        self.text = text
+        self.cols = cols
+
+    @classmethod
+    def empty(cls) -> "FeatureTable":
+        cols: Dict[str, np.ndarray] = {}
+        for c in _INT_COLUMNS:
+            cols[c] = np.zeros(0, dtype=np.int64)
+        for c in _BOOL_COLUMNS:
+            cols[c] = np.zeros(0, dtype=bool)
+        for c in _FLOAT_COLUMNS:
+            cols[c] = np.zeros(0, dtype=np.float64)
+        return cls([], cols)
+
+    @classmethod
+    def concat(cls, tables: List["FeatureTable"]) -> "FeatureTable":
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls.empty()
+        if len(tables) == 1:
+            return tables[0]
+        text: List[str] = []
+        for t in tables:
+            text.extend(t.text)
+        cols = {c: np.concatenate([t.cols[c] for t in tables]) for c in tables[0].cols}
+        return cls(text, cols)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.cols[name]
+
+    def take(self, idx: np.ndarray) -> "FeatureTable":
+        """Rows selected by an index array or boolean mask."""
+        idx = np.asarray(idx)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        return FeatureTable([self.text[i] for i in idx.tolist()], {c: a[idx] for c, a in self.cols.items()})
+
+    def bbox(self, i: int) -> Tuple[float, float, float, float]:
+        c = self.cols
+        return (float(c["x0"][i]), float(c["y0"][i]), float(c["x1"][i]), float(c["y1"][i]))
+
+    def __iter__(self) -> Iterator[FeatureRow]:
+        as_lists = {f: self.cols[f].tolist() for f in _ROW_FIELDS}
+        bboxes = zip(*(self.cols[c].tolist() for c in ("x0", "y0", "x1", "y1")))
+        for i, (text, bbox) in enumerate(zip(self.text, bboxes)):
+            yield FeatureRow(text=text, bbox=bbox, **{f: as_lists[f][i] for f in _ROW_FIELDS})
+
+
 def extract_features(
-    doc: fitz.Document,
+    layout: pr.DocumentLayout,
     pages_info: List[pr.PageInfo],
     body_profile: pr.BodyFontProfile,
     cfg: Task1AConfig,
     page_nums: List[int],
-) -> List[FeatureRow]:
-    results: List[FeatureRow] = []
+) -> FeatureTable:
     body_font_size = max(1e-6, body_profile.size)
 
-    for pinfo in pages_info:
-        lines = list(pr.iter_page_lines(doc, pinfo.index))
-
-        # compute raw gaps
-        raw_gaps_above = []
-        raw_gaps_below = []
-
-        prev_bottom = 0.0
-        first_on_page = True
-        for i, line in enumerate(lines):
-            x0, y0, x1, y1 = line.bbox
-            if first_on_page:
-                gap_above = y0  # distance from page top
-                first_on_page = False
-            else:
-                gap_above = max(0.0, y0 - prev_bottom)
-            raw_gaps_above.append(gap_above)
-            prev_bottom = y1
-
-        # compute gap_below per line
-        for i, line in enumerate(lines):
-            if i == len(lines) - 1:
-                gap_below = (pinfo.height - lines[i].bbox[3])  # to page bottom
-            else:
-                gap_below = max(0.0, lines[i + 1].bbox[1] - lines[i].bbox[3])
-            raw_gaps_below.append(gap_below)
-
-        # stats (page-level or doc-level)
-        gaps_above = [g for g in raw_gaps_above if g is not None]
-        gaps_below = [g for g in raw_gaps_below if g is not None]
-
-        def _safe_stats(data):
-            if not data:
-                return 0.0, 1.0
-            mu = statistics.mean(data)
-            sd = statistics.pstdev(data) or 1.0
-            return mu, sd
-
-        if cfg.spatial.use_page_stats:
-            mu_above, sd_above = _safe_stats(gaps_above)
-            mu_below, sd_below = _safe_stats(gaps_below)
-        else:
-            # (You could compute once across doc; keeping page-only here for simplicity)
-            mu_above, sd_above = _safe_stats(gaps_above)
-            mu_below, sd_below = _safe_stats(gaps_below)
-
-        printed_page_num = page_nums[pinfo.index] if pinfo.index < len(page_nums) else (pinfo.index + 1)
-
-        prev_font_size = body_font_size
-        page_w, page_h = pinfo.width, pinfo.height
-
-        for i, line in enumerate(lines):
-            text = (line.text or "").strip()
-            core_len = _core_len(text)
-            if core_len < cfg.filtering.min_core_chars:
-                continue
-
-            line_font_size = line.majority_font_size() or body_font_size
-            is_bold_majority = line.majority_is_bold()
-
-            x0, y0, x1, y1 = line.bbox
-            width_ratio = (x1 - x0) / page_w if page_w > 0 else 0.0
-
-            gap_above = raw_gaps_above[i]
-            gap_below = raw_gaps_below[i]
-
-            gap_above_z = (gap_above - mu_above) / sd_above if sd_above > 0 else 0.0
-            gap_below_z = (gap_below - mu_below) / sd_below if sd_below > 0 else 0.0
-
-            font_size_ratio = line_font_size / body_font_size
-            size_vs_prev = line_font_size / (prev_font_size or line_font_size)
-
-            line_center = (x0 + x1) / 2.0
-            page_center = page_w / 2.0
-            denom = (page_w / 2.0) if page_w > 0 else 1.0
-            center_deviation = min(1.0, abs(line_center - page_center) / denom)
-
-            page_top_distance = y0 / page_h if page_h > 0 else 0.0
-
-            has_numeric_prefix = 1 if NUMERIC_PREFIX_RE.match(text) else 0
-            words = WORD_RE.findall(text)
-            word_count = len(words)
-
-            ends_with_colon = 1 if text.endswith(":") else 0
-            ends_with_period = 1 if text.endswith(".") else 0
-            title_case_ratio = _title_case_ratio(words)
-            uppercase_ratio = _uppercase_ratio(text)
-
-            row = FeatureRow(
-                page_index0=pinfo.index,
-                page_num1=printed_page_num,
-                text=line.text,
-                bbox=line.bbox,
-                line_font_size=line_font_size,
-                is_bold_majority=is_bold_majority,
-                y_position=y0,
-                width_ratio=width_ratio,
-                vertical_gap=gap_above,
-                gap_below=gap_below,
-                gap_above_z=gap_above_z,
-                gap_below_z=gap_below_z,
-                font_size_ratio=font_size_ratio,
-                has_numeric_prefix=has_numeric_prefix,
-                word_count=word_count,
-                center_deviation=center_deviation,
-                size_vs_prev=size_vs_prev,
-                page_top_distance=page_top_distance,
-                char_count=core_len,
-                ends_with_colon=ends_with_colon,
-                ends_with_period=ends_with_period,
-                title_case_ratio=title_case_ratio,
-                uppercase_ratio=uppercase_ratio,
-                page_width=page_w,
-                page_height=page_h,
-            )
-            results.append(row)
-
-            prev_font_size = line_font_size
-
-    return results
+    # 1) one Python pass over lines: geometry, font and text only
+    page_pos: List[int] = []        # position of the line's page in pages_info
+    geom: List[Tuple[float, float, float, float]] = []
+    font_sizes: List[float] = []
+    bold: List[bool] = []
+    texts: List[str] = []
+    for pos, pinfo in enumerate(pages_info):
+        for line in layout.page_lines(pinfo.index):
+            page_pos.append(pos)
+            geom.append(line.bbox)
+            font_sizes.append(line.majority_font_size() or body_font_size)
+            bold.append(line.majority_is_bold())
+            texts.append(line.text)
+
+    if not texts:
+        return FeatureTable.empty()
+
+    pg = np.asarray(page_pos, dtype=np.int64)
+    g = np.asarray(geom, dtype=np.float64).reshape(-1, 4)
+    x0, y0, x1, y1 = g[:, 0], g[:, 1], g[:, 2], g[:, 3]
+    n_pages = len(pages_info)
+    page_w_all = np.asarray([p.width for p in pages_info], dtype=np.float64)
+    page_h_all = np.asarray([p.height for p in pages_info], dtype=np.float64)
+    page_h = page_h_all[pg]
+
+    # 2) raw gaps over all lines of each page (filtered lines still count as neighbours)
+    first_on_page = np.ones(len(pg), dtype=bool)
+    first_on_page[1:] = pg[1:] != pg[:-1]
+    last_on_page = np.ones(len(pg), dtype=bool)
+    last_on_page[:-1] = pg[1:] != pg[:-1]
+
+    prev_bottom = np.concatenate(([0.0], y1[:-1]))
+    gap_above = np.where(first_on_page, y0, np.maximum(0.0, y0 - prev_bottom))
+    next_top = np.concatenate((y0[1:], [0.0]))
+    gap_below = np.where(last_on_page, page_h - y1, np.maximum(0.0, next_top - y1))
+
+    # 3) per-page mean / population std (sd 0 -> 1), as before for both stats modes
+    counts = np.bincount(pg, minlength=n_pages)
+    safe_counts = np.maximum(counts, 1)
+
+    def _page_z(vals: np.ndarray) -> np.ndarray:
+        mu = np.bincount(pg, weights=vals, minlength=n_pages) / safe_counts
+        dev = vals - mu[pg]
+        sd = np.sqrt(np.bincount(pg, weights=dev * dev, minlength=n_pages) / safe_counts)
+        sd[sd == 0] = 1.0
+        return dev / sd[pg]
+
+    gap_above_z = _page_z(gap_above)
+    gap_below_z = _page_z(gap_below)
+
+    # 4) text features, and the min_core_chars filter
+    core_lens = [_core_len((t or "").strip()) for t in texts]
+    keep = np.asarray(core_lens, dtype=np.int64) >= cfg.filtering.min_core_chars
+    kept = np.flatnonzero(keep)
+    if kept.size == 0:
+        return FeatureTable.empty()
+
+    kept_texts = [texts[i] for i in kept.tolist()]
+    numeric_prefix: List[int] = []
+    word_counts: List[int] = []
+    colon: List[int] = []
+    period: List[int] = []
+    title_ratio: List[float] = []
+    upper_ratio: List[float] = []
+    for raw in kept_texts:
+        text = (raw or "").strip()
+        words = WORD_RE.findall(text)
+        numeric_prefix.append(1 if NUMERIC_PREFIX_RE.match(text) else 0)
+        word_counts.append(len(words))
+        colon.append(1 if text.endswith(":") else 0)
+        period.append(1 if text.endswith(".") else 0)
+        title_ratio.append(_title_case_ratio(words))
+        upper_ratio.append(_uppercase_ratio(text))
+
+    # 5) vectorized geometry on kept rows
+    pg_k = pg[kept]
+    x0_k, y0_k, x1_k, y1_k = x0[kept], y0[kept], x1[kept], y1[kept]
+    page_w = page_w_all[pg_k]
+    page_hk = page_h_all[pg_k]
+    fsz = np.asarray(font_sizes, dtype=np.float64)[kept]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        width_ratio = np.where(page_w > 0, (x1_k - x0_k) / page_w, 0.0)
+        denom = np.where(page_w > 0, page_w / 2.0, 1.0)
+        center_deviation = np.minimum(1.0, np.abs((x0_k + x1_k) / 2.0 - page_w / 2.0) / denom)
+        page_top_distance = np.where(page_hk > 0, y0_k / page_hk, 0.0)
+
+    # previous *kept* line on the same page, body size for the first one
+    first_kept = np.ones(len(kept), dtype=bool)
+    first_kept[1:] = pg_k[1:] != pg_k[:-1]
+    prev_fsz = np.concatenate(([body_font_size], fsz[:-1]))
+    prev_fsz[first_kept] = body_font_size
+
+    page_index0 = np.asarray([p.index for p in pages_info], dtype=np.int64)[pg_k]
+    page_num1 = np.asarray(
+        [page_nums[i] if i < len(page_nums) else i + 1 for i in page_index0.tolist()],
+        dtype=np.int64,
+    )
+
+    cols: Dict[str, np.ndarray] = {
+        "page_index0": page_index0,
+        "page_num1": page_num1,
+        "x0": x0_k,
+        "y0": y0_k,
+        "x1": x1_k,
+        "y1": y1_k,
+        "line_font_size": fsz,
+        "is_bold_majority": np.asarray(bold, dtype=bool)[kept],
+        "y_position": y0_k,
+        "width_ratio": width_ratio,
+        "vertical_gap": gap_above[kept],
+        "gap_below": gap_below[kept],
+        "gap_above_z": gap_above_z[kept],
+        "gap_below_z": gap_below_z[kept],
+        "font_size_ratio": fsz / body_font_size,
+        "has_numeric_prefix": np.asarray(numeric_prefix, dtype=np.int64),
+        "word_count": np.asarray(word_counts, dtype=np.int64),
+        "center_deviation": center_deviation,
+        "size_vs_prev": fsz / prev_fsz,
+        "page_top_distance": page_top_distance,
+        "char_count": np.asarray(core_lens, dtype=np.int64)[kept],
+        "ends_with_colon": np.asarray(colon, dtype=np.int64),
+        "ends_with_period": np.asarray(period, dtype=np.int64),
+        "title_case_ratio": np.asarray(title_ratio, dtype=np.float64),
+        "uppercase_ratio": np.asarray(upper_ratio, dtype=np.float64),
+        "page_width": page_w,
+        "page_height": page_hk,
+    }
+    return FeatureTable(kept_texts, cols)
 
 def _core_len(text: str) -> int:
     return len(_CORE_STRIP_RE.sub("", text or ""))
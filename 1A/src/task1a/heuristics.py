@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Tuple, Set, Dict
+from typing import List, Optional, Tuple, Set, Dict
 import re
-from collections import defaultdict, Counter
+from collections import Counter
+
+import numpy as np
 
 from src.common.config import Task1AConfig
-from src.task1a.feature_extractor import FeatureRow
+from src.task1a.feature_extractor import FeatureTable
 from src.task1a.repetition import is_repeated_exact
 
 NUM_PATTERN = re.compile(r'^\s*\d+(\.\d+)+\s')
@@ -38,10 +40,18 @@ class HeadingCandidate:
     bbox: Tuple[float, float, float, float]
 
 def detect_headings(
-    feature_rows: List[FeatureRow],
+    feature_rows: FeatureTable,
     cfg: Task1AConfig,
     repeated_titles: Set[str] | None = None,
 ) -> List[HeadingCandidate]:
+    """
+    Score every line with the rule set and return the accepted candidates.
+
+    Rules are evaluated as array operations over the feature columns; the
+    bullet-block lookahead and recipe back-link use prefix counts instead of
+    per-row scans. Only string tests (bullets, numbering, normalized text)
+    run per line.
+    """
     sc = cfg.scoring
     filt = cfg.filtering
     kw = cfg.keywords
@@ -52,191 +62,243 @@ def detect_headings(
 
     repeated_titles = repeated_titles or set()
 
-    rows = sorted(feature_rows, key=lambda r: (r.page_index0, r.y_position))
-    bullet_flags = [is_bullet_like(r.text) for r in rows]
-    kw_set = set(k.lower().strip() for k in kw.list) if kw.enabled else set()
+    n = len(feature_rows)
+    if n == 0:
+        return []
+
+    page0 = feature_rows["page_index0"]
+    order = np.lexsort((feature_rows["y_position"], page0))  # stable, like sorted()
+    rows = feature_rows.take(order)
+    texts = rows.text
+    idx = np.arange(n)
+
+    page = rows["page_index0"]
+    wc = rows["word_count"]
+    chars = rows["char_count"]
+    fsr = rows["font_size_ratio"]
 
-    # Page-level repetition
-    page_counts: Dict[int, Counter] = defaultdict(Counter)
-    short_norm_texts: List[str] = []
-    for r in rows:
-        t_norm = norm_text(r.text)
-        short_norm_texts.append(t_norm)
-        if r.word_count > 0 and r.word_count <= rep_cfg.max_words and t_norm:
-            page_counts[r.page_index0][t_norm] += 1
-
-    # Recipe back-link
-    recipe_forced_indices: Set[int] = set()
+    bullet = np.fromiter((is_bullet_like(t) for t in texts), dtype=bool, count=n)
+    kw_set = set(k.lower().strip() for k in kw.list) if kw.enabled else set()
+    short_norm_texts = [norm_text(t) for t in texts]
+
+    # Page-level repetition: per-row count of its normalized text on its page
+    page_counts: Dict[Tuple[int, str], int] = Counter()
+    page_list = page.tolist()
+    wc_list = wc.tolist()
+    for p, w, t_norm in zip(page_list, wc_list, short_norm_texts):
+        if w > 0 and w <= rep_cfg.max_words and t_norm:
+            page_counts[(p, t_norm)] += 1
+
+    # Recipe back-link: nearest title-like row within back_look_lines above a label
+    recipe_forced = np.zeros(n, dtype=bool)
     if rec.enable:
         labels = set(l.lower() for l in rec.labels)
-        for i, r in enumerate(rows):
-            t = (r.text or "").strip().lower()
-            if t in labels:
-                back = max(0, i - rec.back_look_lines)
-                for j in range(i - 1, back - 1, -1):
-                    rj = rows[j]
-                    tj = (rj.text or "").strip()
-                    w = rj.word_count
-                    if w >= rec.min_title_words and w <= rec.max_title_words:
-                        if not tj.endswith(":") and not is_bullet_like(tj):
-                            recipe_forced_indices.add(j)
-                            break
-
-    # Context bullet-block
-    context_bonus_indices: Set[int] = set()
+        is_label = np.fromiter(((t or "").strip().lower() in labels for t in texts), dtype=bool, count=n)
+        if is_label.any():
+            title_like = (
+                (wc >= rec.min_title_words)
+                & (wc <= rec.max_title_words)
+                & ~np.fromiter(((t or "").strip().endswith(":") for t in texts), dtype=bool, count=n)
+                & ~bullet
+            )
+            # last title-like index at or before j (-1 if none)
+            last_title = np.maximum.accumulate(np.where(title_like, idx, -1))
+            lab = np.flatnonzero(is_label & (idx > 0))
+            j = last_title[lab - 1]
+            hit = j >= np.maximum(0, lab - rec.back_look_lines)
+            recipe_forced[j[hit]] = True
+
+    # Context bullet-block: bullets among the next k rows on the same page,
+    # stopping after the first long (> 25 words) row
+    context_bonus = np.zeros(n, dtype=bool)
     if ctx.enable:
         k = ctx.k_lookahead
-        for i, r in enumerate(rows):
-            if r.word_count == 0 or r.word_count > 12:
-                continue
-            limit = min(len(rows), i + 1 + k)
-            bullets = 0
-            for j in range(i + 1, limit):
-                if rows[j].page_index0 != r.page_index0:
-                    break
-                if bullet_flags[j]:
-                    bullets += 1
-                if rows[j].word_count > 25:
-                    break
-            if bullets >= ctx.min_bullets:
-                context_bonus_indices.add(i)
-
-    out: List[HeadingCandidate] = []
-
-    for i, row in enumerate(rows):
-        score = 0
-        rules_fired = 0
-
-        # penalty if smaller than body font
-        if row.font_size_ratio < 1.0:
-            score += sc.rel_font_below_body_penalty
-
-        # 1) Relative font size
-        if row.font_size_ratio > sc.rel_font_size_threshold:
-            score += sc.rel_font_size_score; rules_fired += 1
-
-        # 2) Bold
-        if row.is_bold_majority:
-            score += sc.is_bold_score; rules_fired += 1
-
-        # 3) Top-of-page
-        if row.page_top_distance <= sc.top_pct_threshold:
-            score += sc.top_pct_score; rules_fired += 1
-
-        # 4) Vertical gap (above)
-        if row.vertical_gap > (sc.vertical_gap_multiplier * row.line_font_size):
-            score += sc.vertical_gap_score; rules_fired += 1
-
-        # 5) Short-ish line (<= max_heading_chars)
-        if row.char_count <= filt.max_heading_chars:
-            score += sc.short_line_score; rules_fired += 1
-
-        # NEW 5b) Very short line (<= very_short_char_threshold)
-        if row.char_count <= sc.very_short_char_threshold:
-            score += sc.very_short_line_score; rules_fired += 1
-
-        # 6) Numeric prefix
-        if row.has_numeric_prefix:
-            score += sc.has_numeric_prefix_score; rules_fired += 1
-
-        # 7) Ends with colon
-        if row.ends_with_colon:
-            score += sc.ends_with_colon_score; rules_fired += 1
-
-        # 8) Title case ratio
-        if row.title_case_ratio >= 0.6:
-            score += sc.title_case_score; rules_fired += 1
-
-        # 9) Uppercase ratio
-        if row.uppercase_ratio >= 0.6 and row.char_count <= 60:
-            score += sc.uppercase_ratio_score; rules_fired += 1
-
-        # 10) Ends with period (penalize)
-        if row.ends_with_period and not row.has_numeric_prefix:
-            score += sc.ends_with_period_penalty
-
+        page_end = np.searchsorted(page, page, side="right")       # first row of next page
+        long_at = np.where(wc > 25, idx, n)
+        next_long = np.minimum.accumulate(long_at[::-1])[::-1]      # first long row at/after j
+        next_long_after = np.append(next_long[1:], n)
+        last = np.minimum(np.minimum(idx + k, page_end - 1), next_long_after)
+        last = np.minimum(last, n - 1)
+        bullet_cum = np.concatenate(([0], np.cumsum(bullet)))
+        bullets = np.where(last > idx, bullet_cum[last + 1] - bullet_cum[idx + 1], 0)
+        context_bonus = (wc > 0) & (wc <= 12) & (bullets >= ctx.min_bullets)
+
+    # integer scores unless the config uses fractional weights
+    score_terms = (
+        sc.rel_font_below_body_penalty, sc.rel_font_size_score, sc.is_bold_score, sc.top_pct_score,
+        sc.vertical_gap_score, sc.short_line_score, sc.very_short_line_score,
+        sc.has_numeric_prefix_score, sc.ends_with_colon_score, sc.title_case_score,
+        sc.uppercase_ratio_score, sc.ends_with_period_penalty, sc.heading_score_threshold,
+        rep_cfg.boost_score, rep_cfg.block_bonus, sp.both_sides_bonus, sp.one_side_bonus,
+        ctx.bullet_block_bonus, kw.boost_score, kw.max_extra,
+    )
+    score_dtype = np.int64 if all(isinstance(v, int) for v in score_terms) else np.float64
+    score = np.zeros(n, dtype=score_dtype)
+    rules_fired = np.zeros(n, dtype=np.int64)
+
+    def _rule(mask: np.ndarray, pts, fires: bool = True) -> None:
+        nonlocal score, rules_fired
+        score = score + np.where(mask, pts, 0)
+        if fires:
+            rules_fired = rules_fired + mask
+
+    # penalty if smaller than body font
+    _rule(fsr < 1.0, sc.rel_font_below_body_penalty, fires=False)
+    # 1) Relative font size
+    _rule(fsr > sc.rel_font_size_threshold, sc.rel_font_size_score)
+    # 2) Bold
+    _rule(rows["is_bold_majority"], sc.is_bold_score)
+    # 3) Top-of-page
+    _rule(rows["page_top_distance"] <= sc.top_pct_threshold, sc.top_pct_score)
+    # 4) Vertical gap (above)
+    _rule(rows["vertical_gap"] > (sc.vertical_gap_multiplier * rows["line_font_size"]), sc.vertical_gap_score)
+    # 5) Short-ish line (<= max_heading_chars)
+    _rule(chars <= filt.max_heading_chars, sc.short_line_score)
+    # 5b) Very short line (<= very_short_char_threshold)
+    _rule(chars <= sc.very_short_char_threshold, sc.very_short_line_score)
+    # 6) Numeric prefix
+    has_num = rows["has_numeric_prefix"] != 0
+    _rule(has_num, sc.has_numeric_prefix_score)
+    # 7) Ends with colon
+    _rule(rows["ends_with_colon"] != 0, sc.ends_with_colon_score)
+    # 8) Title case ratio
+    _rule(rows["title_case_ratio"] >= 0.6, sc.title_case_score)
+    # 9) Uppercase ratio
+    _rule((rows["uppercase_ratio"] >= 0.6) & (chars <= 60), sc.uppercase_ratio_score)
+    # 10) Ends with period (penalize)
+    _rule((rows["ends_with_period"] != 0) & ~has_num, sc.ends_with_period_penalty, fires=False)
+
+    if rep_cfg.enable:
+        short = wc <= rep_cfg.max_words
         # 11) Exact whole-line repetition (doc)
-        if rep_cfg.enable and row.word_count <= rep_cfg.max_words:
-            if is_repeated_exact(row.text, repeated_titles):
-                score += rep_cfg.boost_score
-                rules_fired += 1
-
+        if repeated_titles:
+            repeated = np.fromiter((is_repeated_exact(t, repeated_titles) for t in texts), dtype=bool, count=n)
+            _rule(short & repeated, rep_cfg.boost_score)
         # 12) Block (page) repetition bonus
-        if rep_cfg.enable and rep_cfg.block_scope == "page":
-            t_norm = short_norm_texts[i]
-            if t_norm and row.word_count <= rep_cfg.max_words:
-                if page_counts[row.page_index0][t_norm] >= rep_cfg.min_occurrences_block:
-                    score += rep_cfg.block_bonus
-                    rules_fired += 1
-
-        # 13) Spatial isolation
-        if cfg.spatial.enable:
-            above_ok = (row.gap_above_z >= sp.z_above_min)
-            below_ok = (row.gap_below_z >= sp.z_below_min)
-            if sp.first_line_on_page_ignore_above and row.vertical_gap == row.y_position:
-                above_ok = False
-            if above_ok and below_ok:
-                score += sp.both_sides_bonus; rules_fired += 1
-            elif above_ok or below_ok:
-                score += sp.one_side_bonus; rules_fired += 1
-
-        # 14) Context bullet-block lookahead
-        if i in context_bonus_indices:
-            score += ctx.bullet_block_bonus
-            rules_fired += 1
-
-        # 15) Recipe back-link force
-        if i in recipe_forced_indices:
-            need = max(0, sc.heading_score_threshold - score)
-            score += need + 1
-            rules_fired += 1
-
-        # Bullet-like discount if weak
-        if bullet_flags[i] and score < (sc.heading_score_threshold + 1):
-            score -= 1
-
-        # Keyword tie-breaker (FIXED: kw.max_chars)
-        if kw.enabled and row.char_count <= kw.max_chars:
-            txt_norm = (row.text or "").strip().lower()
-            in_frontmatter = (row.page_num1 <= kw.force_h1_max_page) if kw.frontmatter_only else True
-            if in_frontmatter and (score >= kw.apply_if_score_at_least) and (txt_norm in kw_set):
-                score += min(kw.boost_score, kw.max_extra)
-
-        force_pick = NUM_PATTERN.match(row.text or "") is not None
-
-        accept = (
-            (score >= sc.heading_score_threshold)
-            or (rules_fired >= sc.min_rules_fired and score >= (sc.heading_score_threshold - 1))
-            or force_pick
-            or (i in recipe_forced_indices)
+        if rep_cfg.block_scope == "page":
+            block = np.fromiter(
+                (bool(t) and page_counts.get((p, t), 0) >= rep_cfg.min_occurrences_block
+                 for p, t in zip(page_list, short_norm_texts)),
+                dtype=bool,
+                count=n,
+            )
+            _rule(short & block, rep_cfg.block_bonus)
+
+    # 13) Spatial isolation
+    if sp.enable:
+        above_ok = rows["gap_above_z"] >= sp.z_above_min
+        below_ok = rows["gap_below_z"] >= sp.z_below_min
+        if sp.first_line_on_page_ignore_above:
+            above_ok = above_ok & ~(rows["vertical_gap"] == rows["y_position"])
+        _rule(above_ok & below_ok, sp.both_sides_bonus)
+        _rule(above_ok ^ below_ok, sp.one_side_bonus)
+
+    # 14) Context bullet-block lookahead
+    _rule(context_bonus, ctx.bullet_block_bonus)
+
+    # 15) Recipe back-link force: lift to threshold + 1
+    need = np.maximum(0, sc.heading_score_threshold - score)
+    _rule(recipe_forced, need + 1)
+
+    # Bullet-like discount if weak
+    _rule(bullet & (score < (sc.heading_score_threshold + 1)), -1, fires=False)
+
+    # Keyword tie-breaker
+    if kw.enabled and kw_set:
+        in_frontmatter = (rows["page_num1"] <= kw.force_h1_max_page) if kw.frontmatter_only else np.ones(n, dtype=bool)
+        is_kw = np.fromiter(((t or "").strip().lower() in kw_set for t in texts), dtype=bool, count=n)
+        _rule(
+            (chars <= kw.max_chars) & in_frontmatter & (score >= kw.apply_if_score_at_least) & is_kw,
+            min(kw.boost_score, kw.max_extra),
+            fires=False,
         )
 
-        if accept:
-            out.append(HeadingCandidate(
-                page_index0=row.page_index0,
-                page_num1=row.page_num1,
-                text=row.text,
-                score=score,
-                font_size_ratio=row.font_size_ratio,
-                line_font_size=row.line_font_size,
-                is_bold_majority=row.is_bold_majority,
-                page_top_distance=row.page_top_distance,
-                y_position=row.y_position,
-                width_ratio=row.width_ratio,
-                vertical_gap=row.vertical_gap,
-                gap_below=row.gap_below,
-                gap_above_z=row.gap_above_z,
-                gap_below_z=row.gap_below_z,
-                size_vs_prev=row.size_vs_prev,
-                char_count=row.char_count,
-                word_count=row.word_count,
-                has_numeric_prefix=row.has_numeric_prefix,
-                center_deviation=row.center_deviation,
-                bbox=row.bbox,
-            ))
+    force_pick = np.fromiter((NUM_PATTERN.match(t or "") is not None for t in texts), dtype=bool, count=n)
+
+    accept = (
+        (score >= sc.heading_score_threshold)
+        | ((rules_fired >= sc.min_rules_fired) & (score >= (sc.heading_score_threshold - 1)))
+        | force_pick
+        | recipe_forced
+    )
+
+    out: List[HeadingCandidate] = []
+    sel = np.flatnonzero(accept)
+    if sel.size == 0:
+        return out
+    picked = rows.take(sel)
+    scores = score[sel].tolist()
+    for i, row in enumerate(picked):
+        out.append(HeadingCandidate(
+            page_index0=row.page_index0,
+            page_num1=row.page_num1,
+            text=row.text,
+            score=scores[i],
+            font_size_ratio=row.font_size_ratio,
+            line_font_size=row.line_font_size,
+            is_bold_majority=row.is_bold_majority,
+            page_top_distance=row.page_top_distance,
+            y_position=row.y_position,
+            width_ratio=row.width_ratio,
+            vertical_gap=row.vertical_gap,
+            gap_below=row.gap_below,
+            gap_above_z=row.gap_above_z,
+            gap_below_z=row.gap_below_z,
+            size_vs_prev=row.size_vs_prev,
+            char_count=row.char_count,
+            word_count=row.word_count,
+            has_numeric_prefix=row.has_numeric_prefix,
+            center_deviation=row.center_deviation,
+            bbox=row.bbox,
+        ))
 
     return out
 
+class HeadingStream:
+    """
+    `detect_headings` over a document fed as page-ordered chunks of whole pages.
+
+    Every rule is local to a page except the recipe back-link, which lets a
+    label force a title up to `back_look_lines` rows above it, possibly on an
+    earlier page. So each chunk is scored together with a carry of the pages
+    holding the previous window's last `back_look_lines` rows, and candidates
+    on those pages are held back until the next chunk has been seen. The
+    concatenated output equals `detect_headings` on the whole table, while only
+    one chunk plus the carry is in memory.
+
+        stream = HeadingStream(cfg, repeated_titles)
+        for table in chunks:
+            out.extend(stream.feed(table))
+        out.extend(stream.finish())
+    """
+
+    def __init__(self, cfg: Task1AConfig, repeated_titles: Set[str] | None = None):
+        self.cfg = cfg
+        self.repeated_titles = repeated_titles or set()
+        self.back = cfg.recipe.back_look_lines if cfg.recipe.enable else 0
+        self._carry: Optional[FeatureTable] = None
+        self._pending: List[HeadingCandidate] = []
+
+    def feed(self, table: FeatureTable) -> List[HeadingCandidate]:
+        window = table if self._carry is None else FeatureTable.concat([self._carry, table])
+        n = len(window)
+        if n == 0:
+            return []
+        found = detect_headings(window, self.cfg, self.repeated_titles)
+        if self.back <= 0:
+            self._carry, self._pending = None, []
+            return found
+
+        pages = window["page_index0"]
+        cut_page = int(np.sort(pages)[max(0, n - self.back)])
+        self._carry = window.take(pages >= cut_page)
+        self._pending = [c for c in found if c.page_index0 >= cut_page]
+        return [c for c in found if c.page_index0 < cut_page]
+
+    def finish(self) -> List[HeadingCandidate]:
+        out, self._pending, self._carry = self._pending, [], None
+        return out
+
 def is_bullet_like(text: str | None) -> bool:
     if not text:
         return False
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import atexit
+import dataclasses
 import logging
+import math
+import multiprocessing
+import re
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from src.common.config import Task1AConfig
 from src.common import pdf_reader as pr
-from src.task1a import semantic_filter
+from src.common.cache import ArtifactCache, file_digest
+from src.common.timing import Deadline, StageTimer
+from src.task1a import semantic_filter, streaming
 
 
 from src.task1a import (
@@ -22,72 +30,394 @@ from src.task1a import (
 
 log = logging.getLogger(__name__)
 
-def run_pipeline(pdf_path: Path, cfg: Task1AConfig) -> Dict[str, Any]:
-    with pr.open_document(pdf_path) as doc:
-        toc = pr.get_toc(doc)
-        if len(toc) >= cfg.tagged.min_toc_entries:
-            log.debug("Tagged / TOC detected: using fast-path extractor for %s", pdf_path.name)
-            tagged_result = tagged_extractor.extract(doc, toc, cfg)
-            if tagged_result is not None:
-                return writer.make_output_from_tagged(tagged_result, cfg)
+# Bump whenever a code change alters pipeline output or the stage-cache entry
+# format: it is part of both cache keys.
+PIPELINE_VERSION = "3"
+
+# Config sections that can change each memoized stage. Stages are cumulative:
+# a stage is keyed by its own sections plus everything upstream of it.
+_FEATURE_SECTIONS = ("extraction", "body_profile", "filtering", "spatial", "page_numbering")
+_CANDIDATE_SECTIONS = _FEATURE_SECTIONS + (
+    "scoring", "keywords", "repetition", "context", "recipe", "semantic_filter",
+)
+_LABEL_SECTIONS = _CANDIDATE_SECTIONS + ("levels", "salience", "promotion")
+
+def run_pipeline(
+    pdf_path: Path,
+    cfg: Task1AConfig,
+    artifacts: Optional[ArtifactCache] = None,
+    timer: Optional[StageTimer] = None,
+    deadline: Optional[Deadline] = None,
+) -> Dict[str, Any]:
+    """
+    Extract {title, outline} from one PDF.
+
+    When `artifacts` is given, feature rows, heading candidates and labeled
+    headings are memoized on disk, so a config change only recomputes the
+    stages downstream of the sections it touched. When `timer` is given, every
+    stage is timed and pages/lines/candidates/headings are counted into it.
+
+    With `timing.anytime` the run is bounded by `deadline` (by default
+    budget_fraction * hard_timeout_seconds from now): pages are scanned in
+    priority order and optional stages are skipped when time runs short, and
+    the outline found so far is returned with "partial": true.
+    """
+    t = timer or StageTimer()
+    tm = cfg.timing
+    if deadline is None:
+        deadline = Deadline(tm.hard_timeout_seconds * tm.budget_fraction if tm.anytime else None)
+
+    with t.stage("open"):
+        doc = pr.open_document(pdf_path)
+    with doc:
+        layout = _make_layout(doc, cfg)
+        t.count("pages", len(layout))
+
+        with t.stage("toc"):
+            toc = layout.toc
+            tagged_result = None
+            if len(toc) >= cfg.tagged.min_toc_entries:
+                log.debug("Tagged / TOC detected: using fast-path extractor for %s", pdf_path.name)
+                tagged_result = tagged_extractor.extract(layout, toc, cfg)
+        if tagged_result is not None:
+            with t.stage("write"):
+                result = writer.make_output_from_tagged(tagged_result, cfg)
+            t.count("headings", len(result["outline"]))
+            return result
 
         log.debug("Heuristic path for %s", pdf_path.name)
 
-        body_profile = pr.infer_body_font_profile(
-            doc,
-            sample_pages=cfg.body_profile.sample_pages,
-            use_median_font_size=cfg.body_profile.use_median_font_size,
+        memo = _StageMemo(artifacts, pdf_path, cfg, t)
+
+        def _body_profile() -> pr.BodyFontProfile:
+            with t.stage("body_profile"):
+                return pr.infer_body_font_profile(
+                    layout,
+                    sample_pages=cfg.body_profile.sample_pages,
+                    use_median_font_size=cfg.body_profile.use_median_font_size,
+                )
+
+        def _features() -> feature_extractor.FeatureTable:
+            body_profile = _body_profile()
+
+            with t.stage("features"):
+                pages_info = layout.pages_info
+                page_nums = _make_page_numbers(layout, cfg)
+
+                sh = cfg.sharding
+                if sh.workers > 1 and len(pages_info) >= sh.min_pages:
+                    table, complete, skipped = _extract_features_sharded(
+                        pdf_path, pages_info, body_profile, cfg, page_nums, deadline
+                    )
+                    if skipped:
+                        t.count("pages_skipped", skipped)
+                    if not complete:
+                        memo.partial = True
+                    return table
+
+                covered = _prefetch_pages(layout, cfg, page_nums, deadline)
+                if len(covered) < len(pages_info):
+                    log.warning(
+                        "Deadline: %s scanned %d of %d pages", pdf_path.name, len(covered), len(pages_info)
+                    )
+                    t.count("pages_skipped", len(pages_info) - len(covered))
+                    memo.partial = True
+                    pages_info = [pages_info[i] for i in covered]
+                return feature_extractor.extract_features(
+                    layout=layout,
+                    pages_info=pages_info,
+                    body_profile=body_profile,
+                    cfg=cfg,
+                    page_nums=page_nums,
+                )
+
+        def _stream() -> List[heuristics.HeadingCandidate]:
+            # long documents: no document-wide feature table, see streaming.py
+            log.debug("Streaming %d pages of %s", len(layout), pdf_path.name)
+            heading_candidates, complete = streaming.stream_candidates(
+                layout, cfg, _body_profile(), _make_page_numbers(layout, cfg), deadline, t
+            )
+            if not complete:
+                memo.partial = True
+            return heading_candidates
+
+        def _candidates() -> List[heuristics.HeadingCandidate]:
+            if streaming.use_streaming(layout, cfg):
+                heading_candidates = _stream()
+            else:
+                feature_rows = memo("features", _FEATURE_SECTIONS, _features)
+                t.count("lines", len(feature_rows))
+
+                with t.stage("repetition"):
+                    repeated_titles = repetition.find_repeated_headings(feature_rows, cfg)
+
+                with t.stage("heuristics"):
+                    heading_candidates = heuristics.detect_headings(
+                        feature_rows=feature_rows,
+                        cfg=cfg,
+                        repeated_titles=repeated_titles,
+                    )
+            t.count("candidates", len(heading_candidates))
+
+            if not deadline.allows(tm.optional_min_seconds):
+                log.warning("Deadline: skipping the semantic filter for %s", pdf_path.name)
+                memo.partial = True
+                return heading_candidates
+            with t.stage("semantic_filter"):
+                return semantic_filter.filter_candidates(heading_candidates, cfg)
+
+        def _labels() -> List[level_classifier.LabeledHeading]:
+            heading_candidates = memo("candidates", _CANDIDATE_SECTIONS, _candidates)
+
+            level_cfg = cfg
+            if cfg.salience.enable and not deadline.allows(tm.optional_min_seconds):
+                log.warning("Deadline: font-ratio levels instead of salience for %s", pdf_path.name)
+                memo.partial = True
+                level_cfg = dataclasses.replace(cfg, salience=dataclasses.replace(cfg.salience, enable=False))
+
+            with t.stage("levels"):
+                labeled_headings = level_classifier.assign_levels(
+                    heading_candidates=heading_candidates,
+                    cfg=level_cfg,
+                )
+
+            with t.stage("promotion"):
+                return promotion.promote_non_numbered(labeled_headings, cfg)
+
+        labeled_headings = memo("labels", _LABEL_SECTIONS, _labels)
+
+        with t.stage("postprocess"):
+            structured_outline = postprocess.build_outline(
+                labeled_headings=labeled_headings,
+                cfg=cfg,
+            )
+
+        with t.stage("write"):
+            result = writer.make_output_from_outline(
+                outline=structured_outline,
+                cfg=cfg,
+            )
+        t.count("headings", len(result["outline"]))
+        if memo.partial:
+            result["partial"] = True
+
+        return result
+
+class _StageMemo:
+    """
+    Stage cache in front of `compute()`. Entries keep the counters the stage
+    added to the timer (lines, candidates, ...) and replay them on a hit, so
+    cached runs report the same amount of work as fresh ones.
+    """
+
+    def __init__(
+        self,
+        artifacts: Optional[ArtifactCache],
+        pdf_path: Path,
+        cfg: Task1AConfig,
+        timer: StageTimer,
+    ):
+        self.artifacts = artifacts
+        self.timer = timer
+        self.pdf_path = pdf_path
+        self.cfg_dict = cfg.to_dict() if artifacts is not None else {}
+        self._pdf_digest: Optional[str] = None
+        # set once the deadline cut any corner: nothing computed afterwards is stored
+        self.partial = False
+
+    def __call__(self, stage: str, sections: Tuple[str, ...], compute: Callable[[], Any]) -> Any:
+        if self.artifacts is None:
+            return compute()
+        if self._pdf_digest is None:
+            self._pdf_digest = file_digest(self.pdf_path)
+        key = self.artifacts.key(
+            self._pdf_digest, stage, {sec: self.cfg_dict[sec] for sec in sections}
         )
+        hit = self.artifacts.get(key)
+        if hit is not None:
+            log.debug("Stage cache hit: %s for %s", stage, self.pdf_path.name)
+            value, counters = hit
+            for name, n in counters.items():
+                self.timer.count(name, n)
+            return value
+        before = dict(self.timer.counters)
+        value = compute()
+        if not self.partial:
+            counters = {
+                k: n - before.get(k, 0) for k, n in self.timer.counters.items() if n != before.get(k, 0)
+            }
+            self.artifacts.put(key, (value, counters))
+        return value
+
+def _make_layout(doc, cfg: Task1AConfig) -> pr.DocumentLayout:
+    ex = cfg.extraction
+    return pr.DocumentLayout(
+        doc,
+        flags=pr.text_flags(
+            preserve_ligatures=ex.preserve_ligatures,
+            preserve_whitespace=ex.preserve_whitespace,
+            dehyphenate=ex.dehyphenate,
+        ),
+    )
+
+# One page-shard pool per process, reused across documents so batch and serve
+# runs pay the worker start-up once. Dropped (and rebuilt on demand) when a
+# deadline forces its running shards to be killed.
+_shard_pool: Optional[Tuple[int, Any]] = None
+_shard_pool_lock = threading.Lock()
+
+
+def _get_shard_pool(workers: int):
+    global _shard_pool
+    with _shard_pool_lock:
+        if _shard_pool is not None and _shard_pool[0] != workers:
+            _close_shard_pool()
+        if _shard_pool is None:
+            # a multiprocessing Pool rather than an executor: shards that miss the
+            # deadline must be killed, not left running next to the rest of the pipeline
+            _shard_pool = (workers, multiprocessing.Pool(processes=workers))
+        return _shard_pool[1]
+
+
+def _close_shard_pool() -> None:
+    global _shard_pool
+    if _shard_pool is not None:
+        _shard_pool[1].terminate()
+        _shard_pool[1].join()
+        _shard_pool = None
+
+
+atexit.register(_close_shard_pool)
+
+
+def _extract_features_sharded(
+    pdf_path: Path,
+    pages_info: List[pr.PageInfo],
+    body_profile: pr.BodyFontProfile,
+    cfg: Task1AConfig,
+    page_nums: List[int],
+    deadline: Deadline,
+) -> Tuple[feature_extractor.FeatureTable, bool, int]:
+    """
+    Split pages into contiguous ranges and extract features in worker processes.
+
+    Features only depend on the page itself plus the (already known) body profile
+    and page numbers, so concatenating shards in page order equals the serial result.
+    Shards still running at the deadline are dropped; the flag says whether all
+    of them finished, and the count is how many pages went unread.
+    """
+    sh = cfg.sharding
+    n_pages = len(pages_info)
+    # a few shards per worker evens out pages of very different density
+    per_shard = max(sh.min_pages_per_shard, math.ceil(n_pages / (sh.workers * 4)))
+    shards = [pages_info[lo:lo + per_shard] for lo in range(0, n_pages, per_shard)]
+    log.debug("Sharding %s: %d pages in %d shards", pdf_path.name, n_pages, len(shards))
 
-        pages_info = pr.get_pages_info(doc)
-        page_nums = _make_page_numbers(doc, cfg)
+    pool = _get_shard_pool(sh.workers)
+    pending = [
+        pool.apply_async(_extract_shard, (pdf_path, shard, body_profile, cfg, page_nums))
+        for shard in shards
+    ]
+    for r in pending:
+        budget = deadline.remaining() - cfg.timing.finish_reserve_seconds
+        if budget <= 0:
+            break
+        r.wait(None if budget == float("inf") else budget)
 
-        feature_rows = feature_extractor.extract_features(
-            doc=doc,
+    done = [r.ready() for r in pending]
+    parts = [r.get() for r, ok in zip(pending, done) if ok]
+    if all(done):
+        return feature_extractor.FeatureTable.concat(parts), True, 0
+
+    log.warning("Deadline: %s finished %d of %d shards", pdf_path.name, len(parts), len(shards))
+    with _shard_pool_lock:
+        _close_shard_pool()  # kill the shards still running
+    skipped = sum(len(shard) for shard, ok in zip(shards, done) if not ok)
+    if not done[0]:
+        # always answer with at least the front matter
+        front = shards[0][:max(1, cfg.timing.front_pages)]
+        parts.insert(0, _extract_shard(pdf_path, front, body_profile, cfg, page_nums))
+        skipped -= len(front)
+    return feature_extractor.FeatureTable.concat(parts), False, skipped
+
+def _extract_shard(
+    pdf_path: Path,
+    pages_info: List[pr.PageInfo],
+    body_profile: pr.BodyFontProfile,
+    cfg: Task1AConfig,
+    page_nums: List[int],
+) -> feature_extractor.FeatureTable:
+    with pr.open_document(pdf_path) as doc:
+        return feature_extractor.extract_features(
+            layout=_make_layout(doc, cfg),
             pages_info=pages_info,
             body_profile=body_profile,
             cfg=cfg,
             page_nums=page_nums,
         )
 
-        repeated_titles = repetition.find_repeated_headings(feature_rows, cfg)
+# "Introduction ........ 12", "2.1 Scope   7": a title followed by a page number
+_TOC_LINE_RE = re.compile(r"[A-Za-z].*?(?:\.{2,}|…|\s)\s*(\d{1,4})\s*$")
 
-        heading_candidates = heuristics.detect_headings(
-            feature_rows=feature_rows,
-            cfg=cfg,
-            repeated_titles=repeated_titles,
-        )
-        heading_candidates = semantic_filter.filter_candidates(heading_candidates, cfg)
+def _prefetch_pages(
+    layout: pr.DocumentLayout,
+    cfg: Task1AConfig,
+    page_nums: List[int],
+    deadline: Deadline,
+) -> List[int]:
+    """
+    Read page lines in priority order until the deadline (minus the finishing
+    reserve) and return the indices covered, in page order.
 
+    Front matter goes first, then the pages a TOC in the front matter points to,
+    then the rest. Without deadline pressure every page is read, so the result
+    is the same as a plain front-to-back scan.
+    """
+    n_pages = len(layout)
+    reserve = cfg.timing.finish_reserve_seconds
+    covered: Set[int] = set()
 
-        labeled_headings = level_classifier.assign_levels(
-            heading_candidates=heading_candidates,
-            cfg=cfg,
-        )
+    def _scan(indices) -> bool:
+        for i in indices:
+            if i in covered:
+                continue
+            if covered and not deadline.allows(reserve):
+                return False
+            layout.page_lines(i)
+            covered.add(i)
+        return True
 
-        labeled_headings = promotion.promote_non_numbered(labeled_headings, cfg)
+    front = range(min(n_pages, max(1, cfg.timing.front_pages)))
+    if _scan(front) and _scan(_toc_targets(layout, front, page_nums)):
+        _scan(range(n_pages))
+    return sorted(covered)
 
-        structured_outline = postprocess.build_outline(
-            labeled_headings=labeled_headings,
-            cfg=cfg,
-        )
-
-        result = writer.make_output_from_outline(
-            outline=structured_outline,
-            cfg=cfg,
-        )
+def _toc_targets(layout: pr.DocumentLayout, pages, page_nums: List[int]) -> List[int]:
+    """Page indices referenced by TOC-like lines on `pages` (pages with 3+ such lines)."""
+    index_of: Dict[int, int] = {}
+    for i, n in enumerate(page_nums):
+        index_of.setdefault(n, i)
 
-        return result
+    targets: List[int] = []
+    for i in pages:
+        refs = []
+        for line in layout.page_lines(i):
+            m = _TOC_LINE_RE.search(line.text.strip())
+            if m:
+                refs.append(int(m.group(1)))
+        if len(refs) >= 3:
+            targets.extend(index_of[r] for r in refs if r in index_of)
+    return list(dict.fromkeys(targets))
 
-def _make_page_numbers(doc, cfg: Task1AConfig) -> List[int]:
+def _make_page_numbers(layout: pr.DocumentLayout, cfg: Task1AConfig) -> List[int]:
     pn = cfg.page_numbering
     mode = pn.mode
     offset = pn.offset
 
-    n_pages = len(doc)
+    n_pages = len(layout)
 
     if mode == "labels":
-        nums = pr.get_page_number_map(doc, fallback_offset=0)
+        nums = layout.page_number_map
         return [n + offset for n in nums]
 
     if mode == "index0":
@@ -0,0 +1,111 @@
+# src/task1a/pos_lexicon.py
+from __future__ import annotations
+
+import logging
+import re
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+# File layout (little endian):
+#   magic b"POSLEX1\0"
+#   u16 n_tags, then n_tags x (u8 len, ascii tag name)
+#   u8  unknown-word tag index
+#   u32 n_words
+#   u32 len(payload), zlib(payload)
+# payload = "\n".join(words).encode("utf-8") + bytes(tag index per word)
+_MAGIC = b"POSLEX1\0"
+
+# Alphabetic runs, as a stand-in for spaCy's is_alpha tokens
+_ALPHA_RE = re.compile(r"[^\W\d_]+")
+
+
+class PosLexicon:
+    """
+    Word -> coarse POS table exported from a spaCy model.
+
+    Answers the one question the semantic filter asks ("does this short text
+    contain a content word?") without loading spaCy. Words are stored lowercase
+    with their most frequent POS; unseen words get `unknown_pos`.
+    """
+
+    def __init__(self, table: Dict[str, str], unknown_pos: str = "NOUN"):
+        self.table = table
+        self.unknown_pos = unknown_pos
+
+    def pos(self, word: str) -> str:
+        return self.table.get(word.lower(), self.unknown_pos)
+
+    def has_content_pos(self, text: str, content_pos: Set[str]) -> bool:
+        for w in _ALPHA_RE.findall(text or ""):
+            if len(w) > 2 and self.pos(w) in content_pos:
+                return True
+        return False
+
+    # -------------------------
+    # (de)serialization
+    # -------------------------
+
+    def save(self, path: Path) -> None:
+        tags = sorted(set(self.table.values()) | {self.unknown_pos})
+        tag_idx = {t: i for i, t in enumerate(tags)}
+        words = sorted(self.table)
+        payload = "\n".join(words).encode("utf-8") + bytes(tag_idx[self.table[w]] for w in words)
+        blob = zlib.compress(payload, 9)
+
+        out = bytearray(_MAGIC)
+        out += struct.pack("<H", len(tags))
+        for t in tags:
+            name = t.encode("ascii")
+            out += struct.pack("<B", len(name)) + name
+        out += struct.pack("<BII", tag_idx[self.unknown_pos], len(words), len(blob))
+        out += blob
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes(out))
+
+    @classmethod
+    def load(cls, path: Path) -> "PosLexicon":
+        data = path.read_bytes()
+        if not data.startswith(_MAGIC):
+            raise ValueError(f"not a POS lexicon file: {path}")
+        off = len(_MAGIC)
+        (n_tags,) = struct.unpack_from("<H", data, off)
+        off += 2
+        tags: List[str] = []
+        for _ in range(n_tags):
+            (ln,) = struct.unpack_from("<B", data, off)
+            off += 1
+            tags.append(data[off:off + ln].decode("ascii"))
+            off += ln
+        unknown_idx, n_words, blob_len = struct.unpack_from("<BII", data, off)
+        off += struct.calcsize("<BII")
+        payload = zlib.decompress(data[off:off + blob_len])
+
+        if n_words == 0:
+            return cls({}, tags[unknown_idx])
+        words_blob, tag_bytes = payload[:-n_words], payload[-n_words:]
+        words = words_blob.decode("utf-8").split("\n")
+        table = {w: tags[i] for w, i in zip(words, tag_bytes)}
+        return cls(table, tags[unknown_idx])
+
+    @classmethod
+    def from_counts(
+        cls,
+        counts: Iterable[Tuple[str, str, int]],
+        unknown_pos: str = "NOUN",
+    ) -> "PosLexicon":
+        """Build from (word, pos, count) triples, keeping each word's majority POS."""
+        best: Dict[str, Tuple[int, str]] = {}
+        for word, pos, n in counts:
+            w = word.lower()
+            cur = best.get(w)
+            if cur is None or n > cur[0] or (n == cur[0] and pos < cur[1]):
+                best[w] = (n, pos)
+        return cls({w: p for w, (_, p) in best.items()}, unknown_pos)
+
+
+__all__ = ["PosLexicon"]
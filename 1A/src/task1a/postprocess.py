@@ -71,6 +71,9 @@ def build_outline(
                 "text": h.text.strip(),
                 "page": h.page_index0,  # ✅ Now zero-based
                 "score": h.score,
+                # dropped by the writer unless output.include_coordinates
+                "page_index": h.page_index0,
+                "bbox": tuple(h.bbox),
             }
         )
         last_level_int = _LEVEL2INT[normalized_level]
@@ -123,6 +126,9 @@ def _merge_trailing_short_tokens(outline: List[Dict]) -> List[Dict]:
         if _should_merge(prev, item, txt):
             prev["text"] = (prev["text"].rstrip() + " " + txt).strip()
             prev["score"] = max(prev.get("score", 0), item.get("score", 0))
+            if prev.get("bbox") and item.get("bbox"):
+                a, b = prev["bbox"], item["bbox"]
+                prev["bbox"] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
         else:
             merged.append(item)
 
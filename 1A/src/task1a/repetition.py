@@ -1,29 +1,34 @@
 from __future__ import annotations
 
 from collections import Counter
-from typing import Iterable, Set
+from typing import Optional, Set
 
 from src.common.config import Task1AConfig
-from src.task1a.feature_extractor import FeatureRow
+from src.task1a.feature_extractor import FeatureTable
 
 def _norm_exact(text: str) -> str:
     # exact whole-line match: lowercase + collapse whitespace
     return " ".join((text or "").strip().split()).lower()
 
-def find_repeated_headings(rows: Iterable[FeatureRow], cfg: Task1AConfig) -> Set[str]:
-    rep = cfg.repetition
-    if not rep.enable:
+def find_repeated_headings(table: FeatureTable, cfg: Task1AConfig) -> Set[str]:
+    if not cfg.repetition.enable:
         return set()
+    return repeated_from_counts(count_short_lines(table, cfg), cfg)
 
-    counts = Counter()
-    for r in rows:
-        if r.word_count == 0 or r.word_count > rep.max_words:
-            continue
-        t = _norm_exact(r.text)
+def count_short_lines(table: FeatureTable, cfg: Task1AConfig, counts: Optional[Counter] = None) -> Counter:
+    """Add the normalized short lines of `table` to `counts` (streaming: one chunk at a time)."""
+    rep = cfg.repetition
+    counts = Counter() if counts is None else counts
+    wc = table["word_count"]
+    short = (wc > 0) & (wc <= rep.max_words)
+    for i in short.nonzero()[0].tolist():
+        t = _norm_exact(table.text[i])
         if t:
             counts[t] += 1
+    return counts
 
-    return {t for t, c in counts.items() if c >= rep.min_occurrences}
+def repeated_from_counts(counts: Counter, cfg: Task1AConfig) -> Set[str]:
+    return {t for t, c in counts.items() if c >= cfg.repetition.min_occurrences}
 
 def is_repeated_exact(text: str, repeated: Set[str]) -> bool:
     return _norm_exact(text) in repeated
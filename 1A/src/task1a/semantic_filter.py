@@ -1,60 +1,159 @@
 from __future__ import annotations
 
+import logging
 import re
-from typing import List, Set
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Set, Tuple
 from functools import lru_cache
+from pathlib import Path
 
 from src.common.config import Task1AConfig, SemanticFilterConfig
 from src.task1a.heuristics import HeadingCandidate
+from src.task1a.pos_lexicon import PosLexicon
+
+log = logging.getLogger(__name__)
 
 _NUM_RE = re.compile(r'^\s*\d+(\.\d+)*')  # keep numbered headings
 
+# Components needed for Token.pos_: the tagger, the tok2vec it listens to, and the
+# attribute_ruler that maps fine-grained tags to coarse POS. Everything else is excluded
+# at load time, so its weights are never read.
+_POS_PIPES = ("tok2vec", "tagger", "attribute_ruler")
+
+# Cross-document verdict cache: (model, content_pos, text) -> keep?
+# Per process; the lock covers threads sharing it (e.g. the serve worker pool).
+_VerdictKey = Tuple[str, Tuple[str, ...], str]
+_verdicts: "OrderedDict[_VerdictKey, bool]" = OrderedDict()
+_verdicts_lock = threading.Lock()
+
 
 def filter_candidates(cands: List[HeadingCandidate], cfg: Task1AConfig) -> List[HeadingCandidate]:
     sf: SemanticFilterConfig = cfg.semantic_filter
     if not sf.enable:
         return cands
 
-    out: List[HeadingCandidate] = []
-    use_spacy = sf.use_spacy
+    lexicon = _get_lexicon(sf.lexicon_path) if sf.use_lexicon else None
+    use_spacy = sf.use_spacy and lexicon is None
     nlp = _get_nlp_by_model(sf.model) if use_spacy else None
+    if sf.use_lexicon and lexicon is None and nlp is None:
+        # never silently turn a configured POS check into accept-all
+        raise RuntimeError(
+            f"POS lexicon '{sf.lexicon_path}' is unavailable and spaCy model "
+            f"'{sf.model}' could not be loaded as a fallback"
+        )
     content_pos: Set[str] = set(sf.content_pos)
 
-    for c in cands:
+    # verdict per candidate; spaCy-checked ones are filled in after one batched pass
+    keep: List[bool] = []
+    to_tag: Dict[int, str] = {}
+
+    for i, c in enumerate(cands):
         text = (c.text or "").strip()
 
         # always keep numbered headings
         if _NUM_RE.match(text):
-            out.append(c)
+            keep.append(True)
             continue
 
         # alpha ratio quick check
         if not _passes_alpha_ratio(text, sf.min_alpha_ratio):
+            keep.append(False)
             continue
 
         # accept acronyms / all caps like "RFP", "ODL" if length >= min
         if _looks_all_caps_acronym(text, sf.accept_all_caps_minlen):
-            out.append(c)
+            keep.append(True)
             continue
 
         # long candidates: skip spacy (too slow, likely already meaningful)
         if len(text) > sf.max_chars:
-            out.append(c)
+            keep.append(True)
             continue
 
-        if use_spacy and nlp is not None:
-            if _spacy_semantically_ok(text, nlp, content_pos, sf.require_content_pos):
-                out.append(c)
-            else:
-                # drop meaningless shard
-                pass
+        if lexicon is not None:
+            keep.append(not sf.require_content_pos or lexicon.has_content_pos(text, content_pos))
+        elif use_spacy and nlp is not None:
+            # decided below, in one batched pass
+            keep.append(False)
+            to_tag[i] = text
         else:
             # Fallback: simple acceptance on alpha-ratio only
-            out.append(c)
+            keep.append(True)
+
+    if to_tag:
+        verdicts = _spacy_verdicts(
+            list(to_tag.values()), nlp, sf, content_pos
+        )
+        for i, ok in zip(to_tag.keys(), verdicts):
+            keep[i] = ok  # drop meaningless shards
+
+    return [c for c, k in zip(cands, keep) if k]
+
 
+def warm_up(sf: SemanticFilterConfig) -> None:
+    """Load the configured POS backend now instead of on the first document."""
+    if not sf.enable:
+        return
+    if sf.use_lexicon and _get_lexicon(sf.lexicon_path) is not None:
+        return
+    if sf.use_spacy or sf.use_lexicon:
+        _get_nlp_by_model(sf.model)
+
+
+def _spacy_verdicts(
+    texts: List[str],
+    nlp,
+    sf: SemanticFilterConfig,
+    content_pos: Set[str],
+) -> List[bool]:
+    """
+    Verdicts for `texts`, tagging only cache misses through `nlp.pipe` in batches.
+    """
+    if not sf.require_content_pos:
+        return [True] * len(texts)
+
+    pos_key = tuple(sorted(content_pos))
+    keys = [(sf.model, pos_key, t) for t in texts]
+
+    misses: List[str] = []
+    seen: Set[str] = set()
+    with _verdicts_lock:
+        for k, t in zip(keys, texts):
+            if k in _verdicts:
+                _verdicts.move_to_end(k)
+            elif t not in seen:
+                seen.add(t)
+                misses.append(t)
+
+    if misses:
+        docs = nlp.pipe(misses, batch_size=max(1, sf.batch_size))
+        fresh = [(t, _doc_has_content_pos(doc, content_pos)) for t, doc in zip(misses, docs)]
+        with _verdicts_lock:
+            for t, ok in fresh:
+                _remember((sf.model, pos_key, t), ok, sf.cache_size)
+
+    with _verdicts_lock:
+        cached = [_verdicts.get(k) for k in keys]
+    out: List[bool] = []
+    for ok, t in zip(cached, texts):
+        if ok is None:
+            # evicted within this call (cache smaller than the batch): tag directly
+            ok = _doc_has_content_pos(nlp(t), content_pos)
+        out.append(ok)
     return out
 
 
+def _remember(key: _VerdictKey, ok: bool, cache_size: int) -> None:
+    # caller holds _verdicts_lock
+    if cache_size <= 0:
+        return
+    _verdicts[key] = ok
+    _verdicts.move_to_end(key)
+    while len(_verdicts) > cache_size:
+        _verdicts.popitem(last=False)
+
+
 def _passes_alpha_ratio(text: str, min_ratio: float) -> bool:
     letters = [c for c in text if c.isalpha()]
     total = sum(1 for c in text if not c.isspace())
@@ -68,27 +167,47 @@ def _looks_all_caps_acronym(text: str, minlen: int) -> bool:
     return len(letters) >= minlen and letters.isupper()
 
 
-def _spacy_semantically_ok(
-    text: str,
-    nlp,
-    content_pos: Set[str],
-    require_content_pos: bool
-) -> bool:
-    doc = nlp(text)
-    if not require_content_pos:
-        return True
+def _doc_has_content_pos(doc, content_pos: Set[str]) -> bool:
     for tok in doc:
         if tok.is_alpha and tok.pos_ in content_pos and len(tok.text) > 2:
             return True
     return False
 
 
+def _non_pos_pipes(model_name: str) -> List[str]:
+    """Pipeline components of an installed model (package or path) that POS tagging does not need."""
+    import spacy
+
+    try:
+        model_dir = spacy.util.get_package_path(model_name)
+    except Exception:
+        model_dir = Path(model_name)
+    config = spacy.util.load_config(model_dir / "config.cfg")
+    return [p for p in config["nlp"]["pipeline"] if p not in _POS_PIPES]
+
+
 @lru_cache(maxsize=4)
 def _get_nlp_by_model(model_name: str):
-    """Cache spaCy model by its name (hashable)."""
+    """Cache spaCy model by its name (hashable), loading only the POS components."""
     try:
         import spacy
-        return spacy.load(model_name)
+        try:
+            exclude = _non_pos_pipes(model_name)
+        except Exception:
+            exclude = []  # unreadable config: load everything, disable below
+        nlp = spacy.load(model_name, exclude=exclude)
+        nlp.select_pipes(disable=[p for p in nlp.pipe_names if p not in _POS_PIPES])
+        return nlp
+    except Exception as e:
+        log.warning("Could not load spaCy model '%s': %s", model_name, e)
+        return None
+
+
+@lru_cache(maxsize=4)
+def _get_lexicon(path: str):
+    """Cache the precompiled POS lexicon by path; None (with a warning) falls back to spaCy."""
+    try:
+        return PosLexicon.load(Path(path))
     except Exception as e:
-        print(f"[semantic_filter] Could not load spaCy model '{model_name}': {e}")
+        log.warning("Could not load POS lexicon '%s', falling back to spaCy: %s", path, e)
         return None
@@ -0,0 +1,97 @@
+# src/task1a/streaming.py
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from time import perf_counter
+from typing import List, Tuple
+
+from src.common import pdf_reader as pr
+from src.common.config import Task1AConfig
+from src.common.timing import Deadline, StageTimer
+from src.task1a import feature_extractor, heuristics, repetition
+
+log = logging.getLogger(__name__)
+
+
+def use_streaming(layout: pr.DocumentLayout, cfg: Task1AConfig) -> bool:
+    st = cfg.streaming
+    return st.enable and len(layout) >= st.min_pages
+
+
+def stream_candidates(
+    layout: pr.DocumentLayout,
+    cfg: Task1AConfig,
+    body_profile: pr.BodyFontProfile,
+    page_nums: List[int],
+    deadline: Deadline,
+    timer: StageTimer,
+) -> Tuple[List[heuristics.HeadingCandidate], bool]:
+    """
+    Heading candidates of a long document in two passes over page chunks.
+
+    Pass 1 extracts each chunk only to count repeated short lines, the one
+    document-wide statistic the heuristics need (the body profile is sampled
+    up front). Pass 2 extracts the chunks again and scores them through a
+    HeadingStream. Page lines are dropped after each chunk, so memory stays
+    bounded by one chunk instead of the whole document. Same output as
+    features -> repetition -> detect_headings; the flag is False when the
+    deadline stopped either pass early.
+    """
+    st = cfg.streaming
+    pages_info = layout.pages_info
+    step = max(1, st.pages_per_chunk)
+    chunks = [pages_info[lo:lo + step] for lo in range(0, len(pages_info), step)]
+    reserve = cfg.timing.finish_reserve_seconds
+
+    def _extract(chunk: List[pr.PageInfo]) -> feature_extractor.FeatureTable:
+        with timer.stage("features"):
+            table = feature_extractor.extract_features(
+                layout=layout,
+                pages_info=chunk,
+                body_profile=body_profile,
+                cfg=cfg,
+                page_nums=page_nums,
+            )
+        layout.forget(p.index for p in chunk)
+        return table
+
+    # pass 1: document-level statistics. Stop early enough that pass 2 can
+    # revisit every chunk seen here (about the same cost again) in time.
+    counts: Counter = Counter()
+    seen = 0
+    start = perf_counter()
+    for chunk in chunks:
+        if seen and not deadline.allows(reserve + (seen + 2) * (perf_counter() - start) / seen):
+            break
+        table = _extract(chunk)
+        with timer.stage("repetition"):
+            if cfg.repetition.enable:
+                repetition.count_short_lines(table, cfg, counts)
+        timer.count("lines", len(table))
+        seen += 1
+    repeated = repetition.repeated_from_counts(counts, cfg) if cfg.repetition.enable else set()
+
+    # pass 2: sliding-window scoring
+    stream = heuristics.HeadingStream(cfg, repeated)
+    out: List[heuristics.HeadingCandidate] = []
+    done = 0
+    for chunk in chunks[:seen]:
+        if done and not deadline.allows(reserve):
+            break
+        table = _extract(chunk)
+        with timer.stage("heuristics"):
+            out.extend(stream.feed(table))
+        done += 1
+    with timer.stage("heuristics"):
+        out.extend(stream.finish())
+
+    complete = done == len(chunks)
+    if not complete:
+        covered = sum(len(c) for c in chunks[:done])
+        log.warning("Deadline: streamed %d of %d pages", covered, len(pages_info))
+        timer.count("pages_skipped", len(pages_info) - covered)
+    return out, complete
+
+
+__all__ = ["use_streaming", "stream_candidates"]
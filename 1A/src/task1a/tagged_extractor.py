@@ -6,8 +6,6 @@ import re
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 
-import fitz  # PyMuPDF
-
 from src.common.config import Task1AConfig
 from src.common import pdf_reader as pr
 
@@ -19,9 +17,12 @@ class TaggedHeading:
     level: str          # "H1" | "H2" | "H3"
     text: str
     page: int           # ✅ 0-based page index
+    # only with output.include_coordinates: physical page + heading box on it
+    page_index: Optional[int] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
 
 
-def extract(doc: fitz.Document,
+def extract(layout: pr.DocumentLayout,
             toc: List[Tuple[int, str, int]],
             cfg: Task1AConfig) -> Optional[List[TaggedHeading]]:
     """
@@ -39,15 +40,22 @@ def extract(doc: fitz.Document,
 
     headings: List[TaggedHeading] = []
     min_chars = cfg.filtering.min_core_chars
+    want_coords = cfg.output.include_coordinates
+    points = layout.toc_points if want_coords else []
 
-    for lvl, title, page in toc:
+    for i, (lvl, title, page) in enumerate(toc):
         text = (title or "").strip()
         if _core_len(text) < min_chars:
             continue  # skip noise
 
         h = _map_level_to_h(lvl)
         page_index0 = max(0, int(page) - 1)  # ✅ convert to 0-based safely
-        headings.append(TaggedHeading(level=h, text=text, page=page_index0))
+        heading = TaggedHeading(level=h, text=text, page=page_index0)
+        if want_coords and 0 <= page < len(layout):
+            point = points[i] if i < len(points) else None
+            heading.page_index = page
+            heading.bbox = _locate(layout, page, text, point)
+        headings.append(heading)
 
     if not headings:
         return None
@@ -67,6 +75,41 @@ def _core_len(text: str) -> int:
     return len(_CORE_STRIP_RE.sub("", text))
 
 
+def _locate(
+    layout: pr.DocumentLayout,
+    page_index: int,
+    title: str,
+    point: Optional[Tuple[float, float]],
+) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Box of the heading line on its target page.
+
+    The TOC destination point only says where the section starts (usually the
+    top-left of the heading, sometimes the page top), so snap to the first line
+    at or below it whose text starts the title. Without a matching line, fall
+    back to the point itself as a zero-size box.
+    """
+    key = _norm(title)
+    y_min = point[1] - 2.0 if point is not None else float("-inf")
+    above = None
+    for line in layout.page_lines(page_index):
+        t = _norm(line.text)
+        if len(t) < min(8, len(key)) or not (key.startswith(t) or t.startswith(key)):
+            continue
+        if line.bbox[3] >= y_min:
+            return line.bbox
+        above = above or line.bbox
+    if above is not None:
+        return above
+    if point is not None:
+        return (point[0], point[1], point[0], point[1])
+    return None
+
+
+def _norm(text: str) -> str:
+    return " ".join((text or "").split()).lower()
+
+
 def _map_level_to_h(toc_level: int) -> str:
     """
     Map arbitrary TOC levels to H1 / H2 / H3.
@@ -8,14 +8,32 @@ from src.task1a.tagged_extractor import TaggedHeading
 
 _GARBAGE_RE = re.compile(r"(.)\s*\1\s*(\1|\s)*", re.IGNORECASE)
 
+_PUBLIC_KEYS = ("level", "text", "page")
+
 def make_output_from_tagged(tagged_headings: List[TaggedHeading], cfg: Task1AConfig) -> Dict[str, Any]:
-    outline = [{"level": th.level, "text": th.text, "page": th.page, "score": 0} for th in tagged_headings]
+    outline = [
+        {"level": th.level, "text": th.text, "page": th.page, "score": 0,
+         "page_index": th.page_index, "bbox": th.bbox}
+        for th in tagged_headings
+    ]
     title = _select_title_from_outline(outline)
-    return {"title": title, "outline": [{k: v for k, v in o.items() if k != "score"} for o in outline]}
+    return {"title": title, "outline": [_public_entry(o, cfg) for o in outline]}
 
 def make_output_from_outline(outline: List[Dict[str, Any]], cfg: Task1AConfig) -> Dict[str, Any]:
     title = _select_title_from_outline(outline)
-    return {"title": title, "outline": [{k: v for k, v in o.items() if k != "score"} for o in outline]}
+    return {"title": title, "outline": [_public_entry(o, cfg) for o in outline]}
+
+def _public_entry(o: Dict[str, Any], cfg: Task1AConfig) -> Dict[str, Any]:
+    """
+    level/text/page, plus with output.include_coordinates the physical 0-based
+    "page_index" and heading "bbox" [x0, y0, x1, y1] in points (top-left origin)
+    when known.
+    """
+    entry = {k: o[k] for k in _PUBLIC_KEYS if k in o}
+    if cfg.output.include_coordinates and o.get("bbox") is not None:
+        entry["page_index"] = o["page_index"]
+        entry["bbox"] = [round(float(v), 2) for v in o["bbox"]]
+    return entry
 
 def _select_title_from_outline(outline: List[Dict[str, Any]]) -> str:
     if not outline:
@@ -0,0 +1,50 @@
+# tests/conftest.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Dict
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.common.config import load_config, Task1AConfig  # noqa: E402
+from src.task1a import semantic_filter  # noqa: E402
+
+from perf_helpers import (  # noqa: E402
+    CONFIG_PATH,
+    StageRun,
+    bundled_pdfs,
+    calibration_workload,
+    has_toc,
+    run_stages,
+)
+
+
+@pytest.fixture(scope="session")
+def calibration() -> float:
+    """Seconds for the calibration workload on this machine (best of 5)."""
+    times = []
+    for _ in range(5):
+        start = perf_counter()
+        calibration_workload()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+@pytest.fixture(scope="session")
+def cfg() -> Task1AConfig:
+    cfg = load_config(CONFIG_PATH)
+    cfg.sharding.workers = 0
+    semantic_filter.warm_up(cfg.semantic_filter)
+    return cfg
+
+
+@pytest.fixture(scope="session")
+def stage_runs(cfg: Task1AConfig) -> Dict[str, StageRun]:
+    """Timed `run_pipeline` runs of every bundled PDF that takes the heuristic path."""
+    return {p.name: run_stages(p, cfg) for p in bundled_pdfs() if not has_toc(p, cfg)}
@@ -0,0 +1,183 @@
+# tests/perf_helpers.py
+from __future__ import annotations
+
+import json
+import os
+import random
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from unittest import mock
+
+import numpy as np
+
+from src.common import io as io_utils
+from src.common import pdf_reader as pr
+from src.common.config import load_config, Task1AConfig
+from src.common.timing import Deadline, StageTimer
+from src.task1a import (
+    feature_extractor,
+    heuristics,
+    level_classifier,
+    promotion,
+    semantic_filter,
+)
+from src.task1a.pipeline import run_pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+INPUT_DIR = ROOT / "input"
+OUTPUT_DIR = ROOT / "output"
+CONFIG_PATH = ROOT / "configs" / "task1a.yaml"
+
+# Budgets are multiples of the calibration run, so they travel across machines.
+# TASK1A_PERF_SLACK loosens every budget at once (e.g. 3 on a loaded CI box).
+PERF_SLACK = float(os.environ.get("TASK1A_PERF_SLACK", "1.0"))
+
+
+def bundled_pdfs() -> List[Path]:
+    return io_utils.list_input_pdfs(INPUT_DIR)
+
+
+def expected_output(pdf_path: Path) -> Dict[str, Any]:
+    out_path = OUTPUT_DIR / f"{io_utils.safe_stem(pdf_path)}.json"
+    return json.loads(out_path.read_text(encoding="utf-8"))
+
+
+def expected_for(name: str) -> Dict[str, Any]:
+    return expected_output(INPUT_DIR / name)
+
+
+def has_toc(pdf_path: Path, cfg: Task1AConfig) -> bool:
+    with pr.open_document(pdf_path) as doc:
+        return len(doc.get_toc()) >= cfg.tagged.min_toc_entries
+
+
+def heuristic_pdf_names() -> List[str]:
+    """Bundled PDFs that take the heuristic (no TOC) path under the default config."""
+    cfg = load_config(CONFIG_PATH)
+    return [p.name for p in bundled_pdfs() if not has_toc(p, cfg)]
+
+
+@dataclass
+class StageRun:
+    """Intermediate outputs of one heuristic-path `run_pipeline`, plus per-stage cost."""
+
+    features: feature_extractor.FeatureTable
+    found: List[heuristics.HeadingCandidate]
+    candidates: List[heuristics.HeadingCandidate]
+    labeled: List[level_classifier.LabeledHeading]
+    result: Dict[str, Any]
+    seconds: Dict[str, float] = field(default_factory=dict)
+    peak_bytes: Dict[str, int] = field(default_factory=dict)
+
+
+class MemoryTimer(StageTimer):
+    """StageTimer that also keeps the tracemalloc peak allocated inside each stage."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.peak_bytes: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        try:
+            with super().stage(name):
+                yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] - base
+            self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), peak)
+
+
+# (module, function, StageRun field) for every intermediate the tests inspect
+_RECORDED = (
+    (feature_extractor, "extract_features", "features"),
+    (heuristics, "detect_headings", "found"),
+    (semantic_filter, "filter_candidates", "candidates"),
+    (promotion, "promote_non_numbered", "labeled"),
+)
+
+
+@contextmanager
+def _recording() -> Iterator[Dict[str, Any]]:
+    """Keep the return value of each stage function `run_pipeline` calls."""
+    seen: Dict[str, Any] = {}
+
+    def _spy(fn, key):
+        def wrapper(*args, **kwargs):
+            seen[key] = fn(*args, **kwargs)
+            return seen[key]
+        return wrapper
+
+    with ExitStack() as stack:
+        for module, name, key in _RECORDED:
+            stack.enter_context(mock.patch.object(module, name, _spy(getattr(module, name), key)))
+        yield seen
+
+
+def run_stages(pdf_path: Path, cfg: Task1AConfig, repeat: int = 3) -> StageRun:
+    """
+    Run `run_pipeline` on the heuristic path with a StageTimer. Times are the
+    best of `repeat` plain runs; memory is the tracemalloc peak per stage of one
+    extra run (tracing skews time). No deadline, so no stage is ever skipped.
+    """
+    best: Dict[str, float] = {}
+    for _ in range(repeat):
+        timer = StageTimer()
+        with _recording() as seen:
+            result = run_pipeline(pdf_path, cfg, timer=timer, deadline=Deadline(None))
+        for name, elapsed in timer.stages.items():
+            best[name] = min(best.get(name, elapsed), elapsed)
+
+    traced = MemoryTimer()
+    tracemalloc.start()
+    try:
+        run_pipeline(pdf_path, cfg, timer=traced, deadline=Deadline(None))
+    finally:
+        tracemalloc.stop()
+
+    return StageRun(
+        features=seen["features"],
+        found=seen["found"],
+        candidates=seen["candidates"],
+        labeled=seen["labeled"],
+        result=result,
+        seconds=best,
+        peak_bytes=traced.peak_bytes,
+    )
+
+
+def calibration_workload() -> None:
+    # a fixed mix of NumPy and pure-Python work, roughly like the pipeline's
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abcdefghij ") for _ in range(40)) for _ in range(3000)]
+    sum(len(w.split()) for w in words if w.strip().istitle() or w[:1] != "x")
+    arr = np.random.default_rng(0).random(100_000)
+    np.sort(arr)
+    np.bincount((arr * 1000).astype(np.int64)).cumsum()
+
+
+def assert_budget(
+    run: StageRun,
+    stage: str,
+    calibration: float,
+    time_units: float,
+    mem_mb: float,
+) -> None:
+    """`stage` must take at most `time_units` calibration runs and `mem_mb` MiB."""
+    limit_s = time_units * calibration * PERF_SLACK
+    assert run.seconds[stage] <= limit_s, (
+        f"{stage}: {run.seconds[stage] * 1e3:.1f} ms > budget {limit_s * 1e3:.1f} ms "
+        f"({time_units} x calibration {calibration * 1e3:.1f} ms)"
+    )
+    limit_b = mem_mb * 2**20 * PERF_SLACK
+    assert run.peak_bytes[stage] <= limit_b, (
+        f"{stage}: peak {run.peak_bytes[stage] / 2**20:.2f} MiB > budget {limit_b / 2**20:.2f} MiB"
+    )
+
+
+def heading_pairs(result: Dict[str, Any]) -> List[Tuple[str, str, int]]:
+    return [(o["level"], o["text"], o["page"]) for o in result["outline"]]
@@ -0,0 +1,84 @@
+# tests/test_features.py
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from perf_helpers import (
+    assert_budget,
+    bundled_pdfs,
+    expected_for,
+    expected_output,
+    heading_pairs,
+    heuristic_pdf_names,
+)
+from src.common.timing import Deadline
+from src.task1a.feature_extractor import FeatureTable
+from src.task1a.pipeline import run_pipeline
+
+# Budgets per StageTimer stage: (calibration units, MiB). body_profile is
+# where the page layouts are first read.
+BUDGETS = {
+    "body_profile": (1.5, 2.0),
+    "features": (3.0, 4.0),
+}
+
+_HEURISTIC = heuristic_pdf_names()
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+@pytest.mark.parametrize("pdf_path", bundled_pdfs(), ids=lambda p: p.name)
+def test_run_pipeline_matches_output(pdf_path, cfg):
+    result = run_pipeline(pdf_path, cfg)
+    expected = expected_output(pdf_path)
+    assert result["title"] == expected["title"]
+    assert heading_pairs(result) == heading_pairs(expected)
+
+
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_features_cover_outline(name, stage_runs):
+    """Every pinned heading starts on a feature row of its page."""
+    run = stage_runs[name]
+    rows = [(r.page_index0, _norm(r.text)) for r in run.features]
+    for level, text, page in heading_pairs(expected_for(name)):
+        assert any(p == page and t and t in _norm(text) for p, t in rows), (level, text, page)
+
+
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_feature_table_is_consistent(name, stage_runs):
+    table = stage_runs[name].features
+    n = len(table)
+    assert n > 0
+    assert all(len(table[c]) == n for c in table.cols)
+    # rows come out page by page
+    assert np.all(np.diff(table["page_index0"]) >= 0)
+    assert np.all(table["word_count"] > 0)
+    assert np.all(table["font_size_ratio"] > 0)
+
+    # row views, take() and concat() agree with the columns
+    rows = list(table)
+    assert [r.text for r in rows] == table.text
+    half = n // 2
+    joined = FeatureTable.concat([table.take(np.arange(half)), table.take(np.arange(half, n))])
+    assert joined.text == table.text
+    for c in table.cols:
+        assert np.array_equal(joined[c], table[c])
+
+
+@pytest.mark.parametrize("stage", sorted(BUDGETS))
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_extract_features_budget(name, stage, stage_runs, calibration):
+    assert_budget(stage_runs[name], stage, calibration, *BUDGETS[stage])
+
+
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_expired_deadline_returns_partial_outline(name, cfg):
+    """With no time left the pipeline still answers, from the front matter only."""
+    pdf_path = next(p for p in bundled_pdfs() if p.name == name)
+    result = run_pipeline(pdf_path, cfg, deadline=Deadline(0.0))
+    assert result["partial"] is True
+    front = cfg.timing.front_pages
+    assert all(o["page"] < front for o in result["outline"])
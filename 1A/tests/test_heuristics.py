@@ -0,0 +1,89 @@
+# tests/test_heuristics.py
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from perf_helpers import assert_budget, expected_for, heading_pairs, heuristic_pdf_names
+from src.task1a import heuristics, repetition, semantic_filter
+
+# Budgets per StageTimer stage: (calibration units, MiB). The semantic filter
+# may tag with spaCy, so its budget leaves room for the model.
+BUDGETS = {
+    "repetition": (0.1, 0.5),
+    "heuristics": (0.25, 2.0),
+    "semantic_filter": (3.0, 64.0),
+    "levels": (0.1, 0.5),
+    "promotion": (0.1, 0.5),
+    "postprocess": (0.1, 0.5),
+}
+
+_HEURISTIC = heuristic_pdf_names()
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_stages_reproduce_output(name, stage_runs):
+    run = stage_runs[name]
+    expected = expected_for(name)
+    assert run.result["title"] == expected["title"]
+    assert heading_pairs(run.result) == heading_pairs(expected)
+
+
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_detect_headings_finds_every_pinned_heading(name, stage_runs):
+    run = stage_runs[name]
+    found = {(c.page_index0, _norm(c.text)) for c in run.found}
+    kept = {(c.page_index0, _norm(c.text)) for c in run.candidates}
+    assert kept <= found
+    for level, text, page in heading_pairs(expected_for(name)):
+        assert any(p == page and t and t in _norm(text) for p, t in kept), (level, text, page)
+
+
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_assign_levels_keeps_candidate_order(name, stage_runs):
+    run = stage_runs[name]
+    assert [(h.page_index0, h.text) for h in run.labeled] == [
+        (c.page_index0, c.text) for c in run.candidates
+    ]
+    assert {h.level for h in run.labeled} <= {"H1", "H2", "H3"}
+
+
+@pytest.mark.parametrize("stage", sorted(BUDGETS))
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_stage_budget(name, stage, stage_runs, calibration):
+    assert_budget(stage_runs[name], stage, calibration, *BUDGETS[stage])
+
+
+@pytest.mark.parametrize("pages_per_chunk", [1, 2, 5])
+@pytest.mark.parametrize("name", _HEURISTIC)
+def test_heading_stream_matches_detect_headings(name, pages_per_chunk, stage_runs, cfg):
+    run = stage_runs[name]
+    table = run.features
+    repeated = repetition.find_repeated_headings(table, cfg)
+    pages = table["page_index0"]
+
+    stream = heuristics.HeadingStream(cfg, repeated)
+    streamed = []
+    for lo in range(0, int(pages.max()) + 1, pages_per_chunk):
+        streamed.extend(stream.feed(table.take((pages >= lo) & (pages < lo + pages_per_chunk))))
+    streamed.extend(stream.finish())
+
+    assert streamed == run.found
+
+
+def test_missing_lexicon_never_accepts_all(stage_runs, cfg, tmp_path):
+    cands = stage_runs[_HEURISTIC[0]].candidates
+    sf = dataclasses.replace(
+        cfg.semantic_filter,
+        use_lexicon=True,
+        lexicon_path=str(tmp_path / "missing.bin"),
+        model=str(tmp_path / "no-such-model"),
+    )
+    broken = dataclasses.replace(cfg, semantic_filter=sf)
+    with pytest.raises(RuntimeError, match="lexicon"):
+        semantic_filter.filter_candidates(cands, broken)
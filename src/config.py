@@ -2,9 +2,28 @@
 Configuration constants for Task 1B
 """
 
+import os
+
 # Sentence-Transformers model identifier
 MODEL_NAME = "all-MiniLM-L6-v2"
 
+# Cross-encoder used to rerank the bi-encoder's top-K
+RERANK_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Inference backend: "torch" (fp32 PyTorch), "onnx" (ONNX Runtime fp32)
+# or "onnx-int8" (dynamically quantized graphs); ONNX graphs come from
+# `python src/export_onnx.py export`
+INFERENCE_BACKEND = os.environ.get("TASK1B_BACKEND", "torch")
+ONNX_MODEL_DIR = os.environ.get("TASK1B_ONNX_DIR", "models/onnx")
+
+# CPU threads for model inference (torch and ONNX Runtime); 0 = library default
+INFERENCE_THREADS = int(os.environ.get("TASK1B_THREADS", "0"))
+
+# Cross-encoder rerank: pairs are sorted by token length and scored in
+# micro-batches, each padded only to its own longest pair
+RERANK_BATCH_SIZE = 16
+RERANK_MAX_LENGTH = 128  # persona + job + heading fit well within this
+
 # Cosine similarity threshold for heading relevance (unused when using reranking)
 DEFAULT_THRESHOLD = 0.4
 
@@ -16,3 +35,9 @@ DEFAULT_INPUT_PDF_DIR = "input/pdfs"
 DEFAULT_TASK1A_OUTPUT_DIR = "1A/outputs"
 DEFAULT_INPUT_SPEC_FILE = "input/challenge1b_input.json"
 DEFAULT_OUTPUT_FILE = "output1b.json"
+
+# Persistent heading-embedding cache, opt-in: set TASK1B_EMBED_CACHE to a
+# directory (e.g. ~/.cache/task1b/embeddings); unset disables it
+EMBED_CACHE_DIR = os.environ.get("TASK1B_EMBED_CACHE") or None
+EMBED_CACHE_DTYPE = "float16"
+EMBED_CACHE_MAX_MB = 256
@@ -0,0 +1,268 @@
+# src/embedding_cache.py
+
+"""
+On-disk heading-embedding store, keyed by (model name, normalized text hash).
+
+Layout under <root>/<model>/:
+  index.json         {"dim", "dtype", "gen", "rows"}; rewritten only when rows
+                     are appended or evicted
+  vectors.<gen>.bin  row-major float16/float32 matrix, memory-mapped for reads
+  keys.<gen>.bin     20-byte sha1 per row, row-aligned with the vectors
+  used.<gen>.bin     float64 last-use time per row, updated in place
+  .lock              flock()ed around every change, so processes can share a root
+
+Only the first `rows` rows of the files named by the index are live. New rows
+are appended to all three files and the index is swapped in atomically
+afterwards, so an interrupted write leaves the previous index valid. A warm
+call reads only the small index and the key rows it has not seen yet, and
+writes only the last-use times of the rows it touched.
+
+When the store outgrows `max_bytes`, or the embedding size changes, the rows
+that survive are written to the next generation's files, the index is swapped
+to name that generation, and only then are the old files removed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+import numpy as np
+
+_KEY_BYTES = 20  # sha1 digest
+_GEN_FILE_RE = re.compile(r'^(vectors|keys|used)\.(\d+)\.bin$')
+
+
+def normalize_text(text: str) -> str:
+    """Cache key text: NFC, collapsed whitespace (case is kept)."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text or '')).strip()
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Usage:
+        store = EmbeddingStore("/var/cache/task1b/embeddings", "all-MiniLM-L6-v2")
+        emb = store.embed(texts, encode_fn)   # encode_fn only sees cache misses
+    """
+
+    def __init__(self, root, model_name, dtype="float16", max_bytes=256 * 1024 * 1024):
+        safe = re.sub(r'[^0-9A-Za-z._-]+', '_', model_name)
+        self.dir = os.path.join(root, safe)
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.max_bytes = int(max_bytes)
+        self._idx_path = os.path.join(self.dir, 'index.json')
+        self._lock_path = os.path.join(self.dir, '.lock')
+        self._gen, self._rows, self._dim = 0, 0, None
+        self._rows_of = {}       # sha1 digest -> row
+        self._vectors = None     # ((gen, rows), memmap)
+        self._refresh()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    def embed(self, texts, encode_fn):
+        """
+        float32 (n, d) embeddings for `texts`, in order. Misses are encoded once
+        per distinct key with `encode_fn(list_of_texts) -> (m, d) array` and stored.
+        """
+        keys = [bytes.fromhex(text_key(t)) for t in texts]
+        fresh = {}
+
+        def _encode_missing():
+            missing = {}
+            for k, t in zip(keys, texts):
+                if k not in self._rows_of and k not in fresh and k not in missing:
+                    missing[k] = t
+            if missing:
+                enc = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+                fresh.update(zip(missing.keys(), enc))
+
+        # encode outside the lock; only rows another process evicted meanwhile
+        # are encoded while holding it
+        self._refresh()
+        _encode_missing()
+        with self._locked():
+            self._refresh()
+            _encode_missing()
+            new = {k: v for k, v in fresh.items() if k not in self._rows_of}
+            if new:
+                self._append(new)
+
+            rows = [self._rows_of.get(k, -1) for k in keys]
+            out = np.empty((len(keys), self._dim or 0), dtype=np.float32)
+            hit = [r for r in rows if r >= 0]
+            if hit:
+                vec = self._memmap()
+                for i, r in enumerate(rows):
+                    if r >= 0:
+                        out[i] = vec[r]
+                self._touch(hit)
+            for i, (k, r) in enumerate(zip(keys, rows)):
+                if r < 0:
+                    out[i] = fresh[k]  # evicted straight away by a tiny max_bytes
+
+            if new and not self._evict_if_needed():
+                self._save_index()
+        return out
+
+    def __len__(self):
+        return len(self._rows_of)
+
+    # -------------------------
+    # Storage
+    # -------------------------
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.dir, exist_ok=True)
+        with open(self._lock_path, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _path(self, kind, gen=None):
+        return os.path.join(self.dir, f'{kind}.{self._gen if gen is None else gen}.bin')
+
+    def _reset(self, gen):
+        self._gen, self._rows, self._dim = gen, 0, None
+        self._rows_of = {}
+        self._vectors = None
+
+    def _refresh(self):
+        """Bring the in-memory key map up to the on-disk index, reading only new key rows."""
+        try:
+            with open(self._idx_path, 'r', encoding='utf-8') as f:
+                idx = json.load(f)
+            if np.dtype(idx['dtype']) != self.dtype or 'entries' in idx:
+                raise ValueError('different storage precision or an older layout')
+            gen, rows, dim = int(idx['gen']), int(idx['rows']), idx['dim']
+        except (OSError, ValueError, KeyError, TypeError):
+            # nothing usable on disk: the next append starts a generation past any stale files
+            if self._rows or self._dim is not None:
+                self._reset(self._gen + 1)
+            return
+        if (gen, rows, dim) == (self._gen, self._rows, self._dim):
+            return
+
+        start = self._rows if gen == self._gen and dim == self._dim and rows > self._rows else 0
+        if start == 0:
+            self._rows_of = {}
+        try:
+            with open(self._path('keys', gen), 'rb') as f:
+                f.seek(start * _KEY_BYTES)
+                raw = f.read((rows - start) * _KEY_BYTES)
+        except OSError:
+            raw = b''
+        if len(raw) != (rows - start) * _KEY_BYTES:
+            self._reset(gen + 1)  # index names rows that are not there: start over
+            return
+        for i in range(rows - start):
+            self._rows_of[raw[i * _KEY_BYTES:(i + 1) * _KEY_BYTES]] = start + i
+        self._gen, self._rows, self._dim = gen, rows, dim
+        self._vectors = None
+
+    def _save_index(self):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self._idx_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                "model": self.model_name,
+                "dim": self._dim,
+                "dtype": self.dtype.name,
+                "gen": self._gen,
+                "rows": self._rows,
+            }, f)
+        os.replace(tmp, self._idx_path)
+        # files of any other generation are unreachable now
+        for name in os.listdir(self.dir):
+            m = _GEN_FILE_RE.match(name)
+            if (m and int(m.group(2)) != self._gen) or name == 'vectors.bin':
+                try:
+                    os.remove(os.path.join(self.dir, name))
+                except OSError:
+                    pass
+
+    def _memmap(self):
+        key = (self._gen, self._rows)
+        if self._vectors is None or self._vectors[0] != key:
+            self._vectors = (key, np.memmap(self._path('vectors'), dtype=self.dtype, mode='r',
+                                            shape=(self._rows, self._dim)))
+        return self._vectors[1]
+
+    def _touch(self, rows):
+        used = np.memmap(self._path('used'), dtype=np.float64, mode='r+', shape=(self._rows,))
+        used[rows] = time.time()
+        del used
+
+    def _append(self, fresh):
+        dim = len(next(iter(fresh.values())))
+        if self._dim not in (None, dim):
+            # model output size changed: start the next generation rather than
+            # rewriting files the saved index still describes
+            self._reset(self._gen + 1)
+        self._dim = dim
+        os.makedirs(self.dir, exist_ok=True)
+        blocks = {
+            'vectors': np.stack(list(fresh.values())).astype(self.dtype).tobytes(),
+            'keys': b''.join(fresh),
+            'used': np.full(len(fresh), time.time(), dtype=np.float64).tobytes(),
+        }
+        widths = {'vectors': self._row_bytes(), 'keys': _KEY_BYTES, 'used': 8}
+        self._vectors = None
+        for kind, block in blocks.items():
+            path = self._path(kind)
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.truncate(self._rows * widths[kind])  # drop rows no index refers to
+                f.seek(0, os.SEEK_END)
+                f.write(block)
+        for i, k in enumerate(fresh):
+            self._rows_of[k] = self._rows + i
+        self._rows += len(fresh)
+
+    def _row_bytes(self):
+        return (self._dim or 0) * self.dtype.itemsize
+
+    def _evict_if_needed(self):
+        """Compact into the next generation when over `max_bytes`; True if it did (and saved)."""
+        if not self._dim or self._rows * self._row_bytes() <= self.max_bytes:
+            return False
+        keep_n = max(0, self.max_bytes // self._row_bytes())
+        used = np.fromfile(self._path('used'), dtype=np.float64, count=self._rows)
+        kept = np.sort(np.argsort(-used, kind='stable')[:keep_n])
+        vectors = np.asarray(self._memmap()[kept])
+        with open(self._path('keys'), 'rb') as f:
+            raw = f.read(self._rows * _KEY_BYTES)
+        keys = [raw[r * _KEY_BYTES:(r + 1) * _KEY_BYTES] for r in kept.tolist()]
+
+        # the new generation is complete on disk before the index names it
+        gen = self._gen + 1
+        for kind, block in (('vectors', vectors.tobytes()),
+                            ('keys', b''.join(keys)),
+                            ('used', used[kept].tobytes())):
+            with open(self._path(kind, gen), 'wb') as f:
+                f.write(block)
+                f.flush()
+                os.fsync(f.fileno())
+        self._gen, self._rows = gen, len(keys)
+        self._rows_of = {k: i for i, k in enumerate(keys)}
+        self._vectors = None
+        self._save_index()
+        return True
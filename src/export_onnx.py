@@ -0,0 +1,206 @@
+# src/export_onnx.py
+
+"""
+Export the 1B models to ONNX (+ int8 dynamic quantization) and check that the
+ONNX backends rank like PyTorch.
+
+    # offline, e.g. at Docker build time
+    python src/export_onnx.py export --out models/onnx
+
+    # exits non-zero if a backend drifts past the tolerances
+    python src/export_onnx.py parity --backend onnx-int8 \\
+        --task1a 1A/outputs --input-spec input/challenge1b_input.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from config import (
+    MODEL_NAME,
+    RERANK_MODEL_NAME,
+    ONNX_MODEL_DIR,
+    TOP_K_RERANK,
+    DEFAULT_TASK1A_OUTPUT_DIR,
+    DEFAULT_INPUT_SPEC_FILE,
+)
+from models import build_registry
+from onnx_backend import model_file
+
+OPSET = 14
+
+
+def _export_graph(model, enc, out_path, output_name):
+    import torch
+
+    names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in enc]
+    axes = {k: {0: "batch", 1: "seq"} for k in names}
+    axes[output_name] = {0: "batch"}
+    torch.onnx.export(
+        model,
+        tuple(enc[k] for k in names),
+        out_path,
+        input_names=names,
+        output_names=[output_name],
+        dynamic_axes=axes,
+        opset_version=OPSET,
+        do_constant_folding=True,
+    )
+
+
+def _quantize(model_dir):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        model_file(model_dir, quantized=False),
+        model_file(model_dir, quantized=True),
+        weight_type=QuantType.QInt8,
+    )
+
+
+def _write_meta(model_dir, meta):
+    with open(os.path.join(model_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _single_output(model, attr):
+    """Wrap a HF model so the exported graph takes positional ids and returns only `attr`."""
+    import torch
+
+    class Wrapped(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *args):
+            names = ("input_ids", "attention_mask", "token_type_ids")
+            return getattr(self.inner(**dict(zip(names, args))), attr)
+
+    return Wrapped(model)
+
+
+def cmd_export(args):
+    from sentence_transformers import SentenceTransformer
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    # bi-encoder: transformer body only; pooling/normalization run in numpy
+    bi_dir = os.path.join(args.out, "bi_encoder")
+    os.makedirs(bi_dir, exist_ok=True)
+    st = SentenceTransformer(MODEL_NAME)
+    body = st[0].auto_model.eval()
+    tok = st.tokenizer
+    enc = tok(["export sample", "a second, longer export sample"], padding=True, return_tensors="pt")
+    _export_graph(_single_output(body, "last_hidden_state"), enc,
+                  model_file(bi_dir, quantized=False), "last_hidden_state")
+    tok.save_pretrained(bi_dir)
+    _write_meta(bi_dir, {
+        "model": MODEL_NAME,
+        "dim": st.get_sentence_embedding_dimension(),
+        "max_seq_length": st.max_seq_length,
+    })
+
+    # cross-encoder: full sequence-classification head
+    ce_dir = os.path.join(args.out, "cross_encoder")
+    os.makedirs(ce_dir, exist_ok=True)
+    tok = AutoTokenizer.from_pretrained(RERANK_MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(RERANK_MODEL_NAME).eval()
+    enc = tok(["query"] * 2, ["export sample", "a second, longer export sample"],
+              padding=True, return_tensors="pt")
+    _export_graph(_single_output(model, "logits"), enc, model_file(ce_dir, quantized=False), "logits")
+    tok.save_pretrained(ce_dir)
+    _write_meta(ce_dir, {"model": RERANK_MODEL_NAME})
+
+    if args.quantize:
+        _quantize(bi_dir)
+        _quantize(ce_dir)
+    print(f"Exported ONNX models to {args.out}")
+    return 0
+
+
+def _corpus(task1a_dir, spec_file):
+    from utils import load_input_spec, load_task1a_outputs
+
+    spec = load_input_spec(spec_file)
+    query = spec["persona"]["role"] + " " + spec["job_to_be_done"]["task"]
+    texts = [h.get("text", "")
+             for data in load_task1a_outputs(task1a_dir).values()
+             for h in data.get("outline", [])]
+    return query, texts
+
+
+def _bi_scores(registry, query, texts, k):
+    """Bi-encoder cosine scores and their top-K indices."""
+    from relevance import cosine_scores, top_k_indices
+
+    bi = registry.get("bi_encoder")
+    q = bi.encode([query], convert_to_numpy=True, normalize_embeddings=True)[0]
+    h = bi.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    scores = cosine_scores(np.asarray(q, np.float32), np.asarray(h, np.float32))
+    return scores, top_k_indices(scores, k).tolist()
+
+
+def cmd_parity(args):
+    query, texts = _corpus(args.task1a, args.input_spec)
+    if not texts:
+        print("no headings to compare")
+        return 0
+    k = min(args.k, len(texts))
+    base, cand = build_registry("torch"), build_registry(args.backend)
+    base_scores, base_topk = _bi_scores(base, query, texts, k)
+    cand_scores, cand_topk = _bi_scores(cand, query, texts, k)
+
+    # compare rerank logits on the same (baseline) candidates
+    pairs = ([query] * len(base_topk), [texts[i] for i in base_topk])
+    base_logits = base.get("cross_encoder").score(*pairs)
+    cand_logits = cand.get("cross_encoder").score(*pairs)
+    base_order = [base_topk[i] for i in np.argsort(-np.asarray(base_logits), kind="stable")]
+    cand_order = [base_topk[i] for i in np.argsort(-np.asarray(cand_logits), kind="stable")]
+
+    report = {
+        "backend": args.backend,
+        "headings": len(texts),
+        "bi_max_abs_diff": float(np.max(np.abs(base_scores - cand_scores))),
+        "bi_topk_overlap": len(set(base_topk) & set(cand_topk)) / k,
+        "rerank_max_abs_diff": float(np.max(np.abs(np.asarray(base_logits) - np.asarray(cand_logits)))),
+        "rerank_top_n_overlap": len(set(base_order[:args.top_n]) & set(cand_order[:args.top_n]))
+                                / max(1, min(args.top_n, k)),
+    }
+    print(json.dumps(report, indent=2))
+
+    ok = (report["bi_max_abs_diff"] <= args.max_bi_diff
+          and report["bi_topk_overlap"] >= args.min_overlap
+          and report["rerank_top_n_overlap"] >= args.min_overlap)
+    if not ok:
+        print(f"parity check FAILED for backend {args.backend}", file=sys.stderr)
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    ex = sub.add_parser("export", help="Export both models to ONNX.")
+    ex.add_argument("--out", default=ONNX_MODEL_DIR)
+    ex.add_argument("--no-quantize", dest="quantize", action="store_false",
+                    help="Skip the int8 dynamic-quantized copies.")
+    ex.set_defaults(func=cmd_export)
+
+    pa = sub.add_parser("parity", help="Compare an ONNX backend's rankings with PyTorch.")
+    pa.add_argument("--backend", default="onnx-int8", choices=("onnx", "onnx-int8"))
+    pa.add_argument("--task1a", default=DEFAULT_TASK1A_OUTPUT_DIR)
+    pa.add_argument("--input-spec", default=DEFAULT_INPUT_SPEC_FILE)
+    pa.add_argument("--k", type=int, default=TOP_K_RERANK, help="Bi-encoder candidates to compare.")
+    pa.add_argument("--top-n", type=int, default=10, help="Reranked positions that must agree.")
+    pa.add_argument("--max-bi-diff", type=float, default=0.05, help="Max |cosine| difference.")
+    pa.add_argument("--min-overlap", type=float, default=0.9, help="Min top-K / top-N set overlap.")
+    pa.set_defaults(func=cmd_parity)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
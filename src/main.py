@@ -1,5 +1,10 @@
+from time import perf_counter
+_START = perf_counter()
+
 import argparse
 import json
+import os
+import sys
 from datetime import datetime
 
 from config import (
@@ -10,12 +15,19 @@ from config import (
     DEFAULT_THRESHOLD
 )
 from utils import (
-    load_input_spec,
+    load_input_specs,
     load_task1a_outputs,
     write_output1b,
-    extract_section_body
+    extract_section_body,
+    validate_spec,
+    document_keys,
+    allowed_documents,
+    PageLineCache
 )
-from relevance import filter_headings
+from relevance import filter_headings_many
+from models import registry
+
+_IMPORTED = perf_counter()
 
 
 def main():
@@ -30,26 +42,76 @@ def main():
                         help="Folder containing Task 1A JSON outputs")
     parser.add_argument("--input-spec", dest="spec_file",
                         default=DEFAULT_INPUT_SPEC_FILE,
-                        help="Path to challenge1b_input.json")
+                        help="Path to challenge1b_input.json, or a directory / "
+                             ".jsonl of many specs (batch mode)")
     parser.add_argument("--output", dest="output_file",
                         default=DEFAULT_OUTPUT_FILE,
-                        help="Path to write output1b.json")
+                        help="Path to write output1b.json (batch mode: output directory, "
+                             "one <spec>.json per spec)")
     parser.add_argument("--threshold", type=float, default=None,
                         help="Optional similarity cutoff override")
+    parser.add_argument("--timing", action="store_true",
+                        help="Print a startup/stage time breakdown to stderr")
     args = parser.parse_args()
+    stages = {"import": _IMPORTED - _START}
+    t = perf_counter()
 
-    # 1) load spec and 1A outputs
-    raw_spec       = load_input_spec(args.spec_file)
-    input_spec     = {
-        "persona":        raw_spec["persona"]["role"],
-        "job_to_be_done": raw_spec["job_to_be_done"]["task"],
-    }
+    # 1) load spec(s) and 1A outputs
+    specs          = load_input_specs(args.spec_file)
+    batch_mode     = not os.path.isfile(args.spec_file) or args.spec_file.endswith(".jsonl")
+    for name, raw_spec in specs:
+        try:
+            validate_spec(raw_spec)
+        except ValueError as e:
+            parser.error(f"invalid spec {name}: {e}")
+    input_specs    = [
+        {
+            "persona":        raw_spec["persona"]["role"],
+            "job_to_be_done": raw_spec["job_to_be_done"]["task"],
+        }
+        for _, raw_spec in specs
+    ]
     task1a_outputs = load_task1a_outputs(args.task1a_dir)
     threshold      = args.threshold if args.threshold is not None else DEFAULT_THRESHOLD
+    doc_keys       = document_keys(task1a_outputs)
+    allowed        = []
+    for name, raw_spec in specs:
+        docs = allowed_documents(raw_spec, doc_keys)
+        if docs is not None and not docs:
+            # e.g. PDFs renamed after 1A ran: better the whole corpus than nothing
+            print(f"warning: no Task 1A output matches the documents of spec {name!r}; "
+                  "searching all documents", file=sys.stderr)
+            docs = None
+        allowed.append(docs)
+
+    stages["load_inputs"] = perf_counter() - t
 
-    # 2) get relevance scores
-    relevant = filter_headings(input_spec, task1a_outputs, threshold)
+    # 2) get relevance scores (corpus embedded once, all queries in one product),
+    #    each spec limited to its own documents
+    t = perf_counter()
+    relevant_per_spec = filter_headings_many(input_specs, task1a_outputs, threshold, allowed_docs=allowed)
+    stages["relevance"] = perf_counter() - t
 
+    page_cache = PageLineCache()  # shared by every spec over the same PDFs
+    stages["section_bodies"] = 0.0
+    for (name, raw_spec), input_spec, relevant in zip(specs, input_specs, relevant_per_spec):
+        output = build_output(raw_spec, input_spec, relevant, args.pdf_dir, page_cache, stages)
+        out_path = os.path.join(args.output_file, f"{name}.json") if batch_mode else args.output_file
+        write_output1b(output, out_path)
+        print(f"Wrote Task 1B output to {out_path}")
+
+    if args.timing:
+        stages["total"] = perf_counter() - _START
+        report = {
+            "specs":  len(specs),
+            "stages": {k: round(v, 4) for k, v in stages.items()},
+            "models": registry.report(),  # import / load / first_inference per model
+        }
+        print(json.dumps(report, indent=2), file=sys.stderr)
+
+
+def build_output(raw_spec, input_spec, relevant, pdf_dir, page_cache=None, stages=None):
+    """Assemble one output1b.json payload from a spec and its relevance hits."""
     # 3) metadata
     metadata = {
         "input_documents":     [d["filename"] for d in raw_spec["documents"]],
@@ -71,7 +133,10 @@ def main():
                 "document":      fname,
                 "section_title": h["text"].strip(),
                 "page_number":   pg,  # still 1-based here
-                "score":         h["score"]
+                "score":         h["score"],
+                # 1A coordinates (output.include_coordinates), when present
+                "page_index":    h.get("page_index"),
+                "bbox":          h.get("bbox"),
             })
     all_hits.sort(key=lambda x: x["score"], reverse=True)
 
@@ -88,21 +153,25 @@ def main():
         })
 
     # 6) subsection analysis (uses page_number as 0-based index)
-    section_meta = [sec.copy() for sec in clean_sections]
+    t = perf_counter()
+    section_meta = [
+        dict(sec, page_index=hit["page_index"], bbox=hit["bbox"])
+        for sec, hit in zip(clean_sections, all_hits)
+    ]
     subsection_analysis = extract_section_body(
         section_meta,
-        args.pdf_dir
+        pdf_dir,
+        cache=page_cache
     )
+    if stages is not None:
+        stages["section_bodies"] += perf_counter() - t
 
     # 7) final output
-    output = {
+    return {
         "metadata":            metadata,
         "extracted_sections":  clean_sections,
         "subsection_analysis": subsection_analysis
     }
-    write_output1b(output, args.output_file)
-    print(f"Wrote Task 1B output to {args.output_file}")
-
 
 if __name__ == "__main__":
     main()
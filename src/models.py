@@ -0,0 +1,164 @@
+# src/models.py
+
+"""
+Lazy model registry for Task 1B.
+
+Nothing heavy is imported until a model is first requested, so `--help`, an
+empty corpus or a fully cached run never pays for torch/transformers. Each
+model records its startup breakdown (library import, weight load, first
+inference) for `main.py --timing`.
+
+The backend is chosen by config.INFERENCE_BACKEND; either way
+"bi_encoder" has SentenceTransformer's `encode` and "cross_encoder" has
+`score(queries, texts) -> [logit, ...]`.
+"""
+
+import os
+from time import perf_counter
+
+from config import (
+    MODEL_NAME,
+    RERANK_MODEL_NAME,
+    INFERENCE_BACKEND,
+    ONNX_MODEL_DIR,
+    INFERENCE_THREADS,
+    RERANK_BATCH_SIZE,
+    RERANK_MAX_LENGTH,
+)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self.timings = {}   # name -> {"import": s, "load": s, "first_inference": s}
+
+    def register(self, name, loader):
+        """`loader(timing) -> model`; it fills timing["import"] itself."""
+        self._loaders[name] = loader
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is None:
+            timing = self.timings.setdefault(name, {})
+            start = perf_counter()
+            model = self._loaders[name](timing)
+            timing["load"] = perf_counter() - start - timing.get("import", 0.0)
+            self._models[name] = model
+        return model
+
+    def loaded(self, name):
+        return name in self._models
+
+    def note_inference(self, name, seconds):
+        """Keep the first inference time per model (warm-up, lazy kernels)."""
+        self.timings.setdefault(name, {}).setdefault("first_inference", seconds)
+
+    def report(self):
+        return {name: {k: round(v, 4) for k, v in t.items()} for name, t in self.timings.items()}
+
+
+def length_bucketed(tokenizer, queries, texts, return_tensors,
+                    batch_size=RERANK_BATCH_SIZE, max_length=RERANK_MAX_LENGTH):
+    """
+    Tokenize (query, text) pairs once, then yield (positions, padded batch)
+    in order of token length so each micro-batch pads only to its own longest pair.
+    """
+    enc = tokenizer(list(queries), list(texts), truncation=True, max_length=max_length)
+    lengths = [len(ids) for ids in enc["input_ids"]]
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    for start in range(0, len(order), max(1, batch_size)):
+        idx = order[start:start + batch_size]
+        batch = tokenizer.pad(
+            {k: [v[i] for i in idx] for k, v in enc.items()},
+            padding=True,
+            return_tensors=return_tensors,
+        )
+        yield idx, batch
+
+
+class TorchCrossEncoder:
+    def __init__(self, tokenizer, model):
+        self.tokenizer = tokenizer
+        self.model = model
+
+    def score(self, queries, texts):
+        import torch
+
+        scores = [0.0] * len(texts)
+        with torch.no_grad():
+            for idx, batch in length_bucketed(self.tokenizer, queries, texts, 'pt'):
+                logits = self.model(**batch).logits.reshape(len(idx), -1)[:, 0].tolist()
+                for i, s in zip(idx, logits):
+                    scores[i] = s
+        return scores
+
+
+def _timed_import(timing, onnx=False):
+    start = perf_counter()
+    if onnx:
+        import onnxruntime  # noqa: F401
+    else:
+        import torch
+        if INFERENCE_THREADS:
+            torch.set_num_threads(INFERENCE_THREADS)
+    import transformers  # noqa: F401
+    timing["import"] = perf_counter() - start
+
+
+def _load_bi_encoder(timing):
+    _timed_import(timing)
+    start = perf_counter()
+    from sentence_transformers import SentenceTransformer
+    timing["import"] += perf_counter() - start
+    try:
+        # safetensors weights are memory-mapped instead of read into a copy
+        return SentenceTransformer(MODEL_NAME, model_kwargs={"use_safetensors": True})
+    except (TypeError, OSError, ValueError):
+        # older sentence-transformers, or a snapshot without .safetensors
+        return SentenceTransformer(MODEL_NAME)
+
+
+def _load_cross_encoder(timing):
+    _timed_import(timing)
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(RERANK_MODEL_NAME)
+    try:
+        model = AutoModelForSequenceClassification.from_pretrained(
+            RERANK_MODEL_NAME, use_safetensors=True, low_cpu_mem_usage=True
+        )
+    except (OSError, ValueError):
+        model = AutoModelForSequenceClassification.from_pretrained(RERANK_MODEL_NAME)
+    model.eval()
+    return TorchCrossEncoder(tokenizer, model)
+
+
+def _onnx_loader(cls_name, subdir, quantized):
+    def load(timing):
+        _timed_import(timing, onnx=True)
+        import onnx_backend
+
+        cls = getattr(onnx_backend, cls_name)
+        return cls(os.path.join(ONNX_MODEL_DIR, subdir), quantized=quantized, threads=INFERENCE_THREADS)
+    return load
+
+
+def build_registry(backend=INFERENCE_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown inference backend {backend!r}; expected one of {BACKENDS}")
+    reg = ModelRegistry()
+    reg.backend = backend
+    if backend == "torch":
+        reg.register("bi_encoder", _load_bi_encoder)
+        reg.register("cross_encoder", _load_cross_encoder)
+    else:
+        quantized = backend == "onnx-int8"
+        reg.register("bi_encoder", _onnx_loader("OnnxBiEncoder", "bi_encoder", quantized))
+        reg.register("cross_encoder", _onnx_loader("OnnxCrossEncoder", "cross_encoder", quantized))
+    return reg
+
+
+registry = build_registry()
@@ -0,0 +1,87 @@
+# src/onnx_backend.py
+
+"""
+ONNX Runtime versions of the 1B models, as exported by `export_onnx.py`.
+
+    <ONNX_MODEL_DIR>/bi_encoder/     model.onnx, model.int8.onnx, tokenizer files, meta.json
+    <ONNX_MODEL_DIR>/cross_encoder/  same layout
+
+They mirror the call shapes relevance.py uses on the PyTorch side:
+`OnnxBiEncoder.encode(...)` like SentenceTransformer.encode, and
+`OnnxCrossEncoder.score(queries, texts)` like models.TorchCrossEncoder.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from models import length_bucketed
+
+
+def model_file(model_dir, quantized):
+    return os.path.join(model_dir, "model.int8.onnx" if quantized else "model.onnx")
+
+
+def _session(path, threads):
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads:
+        opts.intra_op_num_threads = threads
+    return ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+
+class _OnnxModel:
+    def __init__(self, model_dir, quantized=False, threads=0):
+        from transformers import AutoTokenizer
+
+        path = model_file(model_dir, quantized)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run `python src/export_onnx.py export` first")
+        with open(os.path.join(model_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = _session(path, threads)
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def _feed(self, enc):
+        return {k: np.asarray(v, dtype=np.int64) for k, v in enc.items() if k in self._input_names}
+
+
+class OnnxBiEncoder(_OnnxModel):
+    """Transformer graph + mean pooling (+ L2 normalization), as all-MiniLM-L6-v2."""
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **_):
+        texts = list(texts)
+        out = np.zeros((len(texts), self.meta["dim"]), dtype=np.float32)
+        # length-sorted batches pad less, as SentenceTransformer does
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            enc = self.tokenizer(
+                [texts[i] for i in idx],
+                padding=True,
+                truncation=True,
+                max_length=self.meta["max_seq_length"],
+                return_tensors="np",
+            )
+            hidden = self.session.run(None, self._feed(enc))[0]
+            mask = enc["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            out[idx] = pooled
+        if normalize_embeddings:
+            out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out
+
+
+class OnnxCrossEncoder(_OnnxModel):
+    """Sequence-classification graph returning one relevance logit per pair."""
+
+    def score(self, queries, texts):
+        scores = np.zeros(len(texts), dtype=np.float32)
+        for idx, batch in length_bucketed(self.tokenizer, queries, texts, "np"):
+            logits = self.session.run(None, self._feed(batch))[0]
+            scores[idx] = logits.reshape(len(idx), -1)[:, 0]
+        return scores.tolist()
@@ -4,26 +4,80 @@
 Two-stage relevance filtering: fast bi-encoder recall + cross-encoder rerank.
 """
 
+from time import perf_counter
+
 import numpy as np
-import torch
-from sentence_transformers import SentenceTransformer
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
-from config import MODEL_NAME, TOP_K_RERANK
+from config import (
+    MODEL_NAME,
+    TOP_K_RERANK,
+    EMBED_CACHE_DIR,
+    EMBED_CACHE_DTYPE,
+    EMBED_CACHE_MAX_MB,
+)
+from embedding_cache import EmbeddingStore
+from models import registry
 
-# Stage 1: bi-encoder
-_bi_encoder = SentenceTransformer(MODEL_NAME)
+# Stage 1: bi-encoder, Stage 2: cross-encoder (MS-MARCO fine-tuned);
+# both are loaded on first use through models.registry
+
+
+def encode_normalized(texts) -> np.ndarray:
+    """Encode texts into an (n, d) float32 matrix of unit-length rows."""
+    bi_encoder = registry.get("bi_encoder")
+    start = perf_counter()
+    emb = bi_encoder.encode(
+        list(texts),
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    registry.note_inference("bi_encoder", perf_counter() - start)
+    return np.ascontiguousarray(emb, dtype=np.float32)
+
+
+_store = None
+
+
+def embed_headings(texts) -> np.ndarray:
+    """Heading embeddings through the on-disk store; only cache misses are encoded."""
+    global _store
+    if not EMBED_CACHE_DIR:
+        return encode_normalized(texts)
+    if _store is None:
+        _store = EmbeddingStore(
+            EMBED_CACHE_DIR,
+            # int8/ONNX vectors differ slightly from the PyTorch ones
+            MODEL_NAME if registry.backend == "torch" else f"{MODEL_NAME}@{registry.backend}",
+            dtype=EMBED_CACHE_DTYPE,
+            max_bytes=EMBED_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _store.embed(texts, encode_normalized)
 
-# Stage 2: cross-encoder for reranking (MS-MARCO fine-tuned)
-_rerank_tokenizer = AutoTokenizer.from_pretrained("cross-encoder/ms-marco-MiniLM-L-6-v2")
-_rerank_model     = AutoModelForSequenceClassification.from_pretrained(
-    "cross-encoder/ms-marco-MiniLM-L-6-v2"
-)
+
+def cosine_scores(query_emb: np.ndarray, head_emb: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of normalized query vector(s) against normalized heading rows.
+    A (d,) query gives (n,) scores (one GEMV); a (q, d) matrix gives (q, n) (one GEMM).
+    """
+    return head_emb @ query_emb if query_emb.ndim == 1 else query_emb @ head_emb.T
 
 
-def _cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
-    """Cosine similarity between two vectors."""
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, ties by lower index.
+    Works on the last axis, so a (q, n) score matrix gives (q, k) indices.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    if k < n:
+        part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        part = np.broadcast_to(np.arange(n), scores.shape).copy()
+    picked = np.take_along_axis(scores, part, axis=-1)
+    order = np.lexsort((part, -picked), axis=-1)
+    return np.take_along_axis(part, order, axis=-1)
 
 
 def filter_headings(input_spec, task1a_outputs, threshold=None):
@@ -35,55 +89,97 @@ def filter_headings(input_spec, task1a_outputs, threshold=None):
     Returns:
       dict mapping doc_name -> list of heading dicts with 'score' (cross-encoder logits)
     """
-    # Prepare query text
-    persona = input_spec.get('persona', '')
-    job     = input_spec.get('job_to_be_done', '')
-    spec_text = persona + ' ' + job
-
-    # Flatten all headings across documents
-    records = []  # each: { 'doc':doc_name, 'text':heading_text, 'meta':orig_heading_obj }
-    for doc_name, data in task1a_outputs.items():
-        for h in data.get('outline', []):
-            records.append({
-                'doc': doc_name,
-                'text': h.get('text', ''),
-                'meta': h
-            })
-    if not records:
-        return {}
-
-    # Stage 1: bi-encoder embeddings + cosine
-    spec_emb = _bi_encoder.encode([spec_text], convert_to_tensor=False)[0]
-    texts    = [r['text'] for r in records]
-    emb_list = _bi_encoder.encode(texts, convert_to_tensor=False)
-    bi_scores = [ _cosine_sim(spec_emb, emb) for emb in emb_list ]
-
-    # Select top-K indices
-    topk_idx = sorted(range(len(bi_scores)), key=lambda i: bi_scores[i], reverse=True)[:TOP_K_RERANK]
-
-    # Stage 2: cross-encoder rerank
-    spec_inputs = [spec_text] * len(topk_idx)
-    head_texts  = [texts[i] for i in topk_idx]
-    inputs = _rerank_tokenizer(
-        spec_inputs,
-        head_texts,
-        padding=True,
-        truncation=True,
-        return_tensors='pt'
-    )
-    with torch.no_grad():
-        logits = _rerank_model(**inputs).logits.squeeze(-1).tolist()
-
-    # Sort top-K by cross-encoder score
-    reranked = sorted(zip(topk_idx, logits), key=lambda x: x[1], reverse=True)
-
-    # Collect into per-document mapping
-    results = {}
-    for idx, score in reranked:
-        rec = records[idx]
-        doc = rec['doc']
-        entry = rec['meta'].copy()
-        entry['score'] = score
-        results.setdefault(doc, []).append(entry)
-
-    return results
+    return filter_headings_many([input_spec], task1a_outputs, threshold)[0]
+
+
+class HeadingCorpus:
+    """All 1A headings flattened across documents, with their embedding matrix."""
+
+    def __init__(self, task1a_outputs):
+        # each: { 'doc':doc_name, 'text':heading_text, 'meta':orig_heading_obj }
+        self.records = []
+        for doc_name, data in task1a_outputs.items():
+            for h in data.get('outline', []):
+                self.records.append({
+                    'doc': doc_name,
+                    'text': h.get('text', ''),
+                    'meta': h
+                })
+        self.texts = [r['text'] for r in self.records]
+        self.docs  = np.array([r['doc'] for r in self.records], dtype=object)
+        self._emb  = None
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        if self._emb is None:
+            self._emb = embed_headings(self.texts)
+        return self._emb
+
+
+def filter_headings_many(input_specs, task1a_outputs, threshold=None, corpus=None, allowed_docs=None):
+    """
+    `filter_headings` for many persona/job specs over one heading corpus: the
+    headings are embedded once, all queries are scored with one matrix product,
+    and every spec's top-K pairs go through the cross-encoder together.
+
+    `corpus` reuses a resident HeadingCorpus instead of rebuilding one from
+    `task1a_outputs`; `allowed_docs` optionally limits each spec to a set of
+    1A document names (None = all documents).
+
+    Returns a list with one `filter_headings` result per spec, in order.
+    """
+    # Prepare query texts
+    spec_texts = [
+        spec.get('persona', '') + ' ' + spec.get('job_to_be_done', '')
+        for spec in input_specs
+    ]
+
+    corpus  = corpus if corpus is not None else HeadingCorpus(task1a_outputs)
+    records = corpus.records
+    if not records or not spec_texts:
+        return [{} for _ in spec_texts]
+
+    # Stage 1: bi-encoder embeddings + cosine (one GEMM over unit vectors)
+    spec_emb  = encode_normalized(spec_texts)
+    texts     = corpus.texts
+    bi_scores = cosine_scores(spec_emb, corpus.embeddings)  # (specs, headings)
+    for q, docs in enumerate(allowed_docs or []):
+        if docs is not None:
+            bi_scores[q, ~np.isin(corpus.docs, list(docs))] = -np.inf
+
+    # Select top-K indices per spec (never a heading outside its document set)
+    topk_idx = [
+        [i for i in idx if np.isfinite(bi_scores[q, i])]
+        for q, idx in enumerate(top_k_indices(bi_scores, TOP_K_RERANK).tolist())
+    ]
+
+    # Stage 2: cross-encoder rerank, all specs' pairs in one length-bucketed pass
+    spec_inputs = [spec_texts[q] for q, idx in enumerate(topk_idx) for _ in idx]
+    head_texts  = [texts[i] for idx in topk_idx for i in idx]
+    if not spec_inputs:
+        return [{} for _ in spec_texts]  # every spec masked out: no reranker load, no empty pass
+    cross_encoder = registry.get("cross_encoder")
+    start = perf_counter()
+    logits = cross_encoder.score(spec_inputs, head_texts)
+    registry.note_inference("cross_encoder", perf_counter() - start)
+
+    all_results = []
+    offset = 0
+    for idx in topk_idx:
+        spec_logits = logits[offset:offset + len(idx)]
+        offset += len(idx)
+
+        # Sort top-K by cross-encoder score
+        reranked = sorted(zip(idx, spec_logits), key=lambda x: x[1], reverse=True)
+
+        # Collect into per-document mapping
+        results = {}
+        for i, score in reranked:
+            rec = records[i]
+            doc = rec['doc']
+            entry = rec['meta'].copy()
+            entry['score'] = score
+            results.setdefault(doc, []).append(entry)
+        all_results.append(results)
+
+    return all_results
@@ -0,0 +1,285 @@
+# src/serve.py
+
+"""
+Long-running Task 1B relevance server: keeps both models and the heading
+embedding matrix resident and micro-batches concurrent requests.
+
+    python src/serve.py --task1a 1A/outputs --input input/pdfs --port 8766
+    python src/serve.py --unix /tmp/task1b.sock
+
+    POST /relevance   challenge1b_input.json body   -> output1b.json payload
+    GET  /healthz
+
+Requests arriving within `--batch-window-ms` of each other (up to
+`--max-batch`) share one bi-encoder GEMM and one cross-encoder pass. The
+asyncio loop only parses HTTP and queues work; inference runs on a single
+model thread and section-body slicing on a single PyMuPDF thread.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from config import (
+    DEFAULT_INPUT_PDF_DIR,
+    DEFAULT_TASK1A_OUTPUT_DIR,
+    DEFAULT_THRESHOLD,
+)
+from main import build_output
+from models import registry
+from relevance import HeadingCorpus, filter_headings_many
+from utils import (
+    load_task1a_outputs,
+    validate_spec,
+    document_keys,
+    allowed_documents,
+    PageLineCache,
+)
+
+log = logging.getLogger("task1b.serve")
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class RelevanceService:
+    """
+    Resident corpus + models, and a batcher that drains the request queue.
+
+    Each queued item is (input_spec, allowed_docs, future); the batcher waits
+    at most `window` seconds after the first item for more, then runs the
+    whole batch through `filter_headings_many` on the model thread.
+    """
+
+    def __init__(self, task1a_dir, pdf_dir, threshold, window, max_batch, queue_size):
+        self.pdf_dir = pdf_dir
+        self.threshold = threshold
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.task1a_outputs = load_task1a_outputs(task1a_dir)
+        self.corpus = HeadingCorpus(self.task1a_outputs)
+        self._doc_keys = document_keys(self.task1a_outputs)
+        self._model_thread = ThreadPoolExecutor(1, thread_name_prefix="task1b-model")
+        self._pdf_thread = ThreadPoolExecutor(1, thread_name_prefix="task1b-pdf")
+        self._page_cache = PageLineCache()
+        self._queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self._batcher = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        start = perf_counter()
+        await loop.run_in_executor(self._model_thread, self._warm_up)
+        log.info("Loaded models and %d heading embeddings in %.2fs",
+                 len(self.corpus.texts), perf_counter() - start)
+        self._batcher = asyncio.create_task(self._run_batches())
+
+    def _warm_up(self):
+        registry.get("bi_encoder")
+        registry.get("cross_encoder")
+        if self.corpus.texts:
+            _ = self.corpus.embeddings  # computed once, kept resident
+
+    async def close(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._model_thread.shutdown(wait=False, cancel_futures=True)
+        self._pdf_thread.shutdown(wait=False, cancel_futures=True)
+
+    async def relevance(self, raw_spec):
+        validate_spec(raw_spec)  # ValueError -> 400, before anything is queued
+        input_spec = {
+            "persona":        raw_spec["persona"]["role"],
+            "job_to_be_done": raw_spec["job_to_be_done"]["task"],
+        }
+        allowed = allowed_documents(raw_spec, self._doc_keys)
+        if allowed is not None and not allowed:
+            log.warning("No Task 1A output matches the request's documents")
+            raise ValueError("none of the spec's documents has a Task 1A outline")
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((input_spec, allowed, fut))
+        except asyncio.QueueFull:
+            return 503, {"error": "queue full"}
+        relevant = await fut
+        output = await asyncio.get_running_loop().run_in_executor(
+            self._pdf_thread, build_output, raw_spec, input_spec, relevant,
+            self.pdf_dir, self._page_cache,
+        )
+        return 200, output
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                specs, allowed, futures = zip(*batch)
+                start = perf_counter()
+                results = await loop.run_in_executor(
+                    self._model_thread, self._score, list(specs), list(allowed)
+                )
+                if len(results) != len(futures):
+                    raise RuntimeError(f"{len(results)} results for a batch of {len(futures)}")
+                for f, r in zip(futures, results):
+                    if not f.done():
+                        f.set_result(r)
+                log.debug("Scored batch of %d in %.3fs", len(batch), perf_counter() - start)
+            except asyncio.CancelledError:
+                for _, _, f in batch:
+                    f.cancel()
+                raise
+            except Exception as e:
+                # fail this batch's requests; the batcher keeps serving the next one
+                log.exception("Batch of %d failed", len(batch))
+                for _, _, f in batch:
+                    if not f.done():
+                        f.set_exception(e)
+
+    def _score(self, specs, allowed):
+        return filter_headings_many(
+            specs, self.task1a_outputs, self.threshold,
+            corpus=self.corpus, allowed_docs=allowed,
+        )
+
+
+# -------------------------
+# Minimal HTTP/1.1 over asyncio streams
+# -------------------------
+
+async def _reply(writer, status, obj):
+    body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def _make_handler(service, max_body):
+    async def handle(reader, writer):
+        start = perf_counter()
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                k, _, v = line.decode("latin-1").partition(":")
+                headers[k.strip().lower()] = v.strip()
+            if len(request_line) < 2:
+                await _reply(writer, 400, {"error": "bad request line"})
+                return
+            method, path = request_line[0], request_line[1]
+
+            if method == "GET" and path == "/healthz":
+                await _reply(writer, 200, {"status": "ok", "headings": len(service.corpus.texts)})
+                return
+            if method != "POST" or path != "/relevance":
+                await _reply(writer, 404, {"error": "not found"})
+                return
+
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                await _reply(writer, 400, {"error": "bad Content-Length"})
+                return
+            if length > max_body:
+                await _reply(writer, 413, {"error": f"body exceeds {max_body} bytes"})
+                return
+            body = await reader.readexactly(length) if length else b""
+            try:
+                raw_spec = json.loads(body or b"{}")
+                status, result = await service.relevance(raw_spec)
+            except (ValueError, KeyError, TypeError) as e:
+                status, result = 400, {"error": f"invalid spec: {type(e).__name__}: {e}"}
+            except Exception as e:
+                log.exception("Failed request")
+                status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+            await _reply(writer, status, result)
+            log.info("POST /relevance %d in %.3fs", status, perf_counter() - start)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Task 1B: relevance server.")
+    parser.add_argument("--input", dest="pdf_dir", default=DEFAULT_INPUT_PDF_DIR,
+                        help="Folder containing PDFs")
+    parser.add_argument("--task1a", dest="task1a_dir", default=DEFAULT_TASK1A_OUTPUT_DIR,
+                        help="Folder containing Task 1A JSON outputs")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket instead of TCP.")
+    parser.add_argument("--batch-window-ms", type=float, default=10.0,
+                        help="How long the first queued request waits for others to join its batch.")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--queue-size", type=int, default=256,
+                        help="Max requests waiting for a batch; more get HTTP 503.")
+    parser.add_argument("--max-body", type=int, default=1 << 20)
+    parser.add_argument("--log-level", default="INFO",
+                        choices=("DEBUG", "INFO", "WARNING", "ERROR"))
+    return parser.parse_args()
+
+
+async def _serve(args):
+    service = RelevanceService(
+        args.task1a_dir, args.pdf_dir, args.threshold,
+        window=args.batch_window_ms / 1000.0,
+        max_batch=args.max_batch,
+        queue_size=args.queue_size,
+    )
+    await service.start()
+    handler = _make_handler(service, args.max_body)
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.unlink(args.unix)
+        server = await asyncio.start_unix_server(handler, path=args.unix)
+        log.info("Serving on unix:%s", args.unix)
+    else:
+        server = await asyncio.start_server(handler, args.host, args.port)
+        log.info("Serving on http://%s:%d", args.host, args.port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format="%(asctime)s | %(levelname)s | %(message)s",
+    )
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
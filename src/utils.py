@@ -2,6 +2,8 @@ import os
 import glob
 import re
 import json
+from collections import OrderedDict, defaultdict
+
 import fitz  # PyMuPDF
 
 
@@ -10,6 +12,43 @@ def load_input_spec(spec_path):
         return json.load(f)
 
 
+def load_input_specs(spec_path):
+    """
+    [(name, spec), ...] from a single spec JSON, a directory of spec JSONs,
+    or a JSONL file with one spec per line (named by its "id" or line number).
+    Names are safe file stems and unique within the batch.
+    """
+    if os.path.isdir(spec_path):
+        specs = [
+            (os.path.splitext(os.path.basename(p))[0], load_input_spec(p))
+            for p in sorted(glob.glob(os.path.join(spec_path, '*.json')))
+        ]
+    elif spec_path.endswith('.jsonl'):
+        specs = []
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            for i, line in enumerate(f):
+                if line.strip():
+                    spec = json.loads(line)
+                    specs.append((str(spec.get('id') or f"spec_{i:04d}"), spec))
+    else:
+        specs = [(os.path.splitext(os.path.basename(spec_path))[0], load_input_spec(spec_path))]
+    return _unique_names(specs)
+
+
+def _unique_names(specs):
+    """Sanitize names to [0-9A-Za-z._-] (no leading dot) and suffix repeats with _2, _3, ..."""
+    taken, named = set(), []
+    for i, (name, spec) in enumerate(specs):
+        base = re.sub(r'[^0-9A-Za-z._-]+', '_', name).lstrip('.') or f"spec_{i:04d}"
+        unique, n = base, 1
+        while unique.lower() in taken:
+            n += 1
+            unique = f"{base}_{n}"
+        taken.add(unique.lower())
+        named.append((unique, spec))
+    return named
+
+
 def load_task1a_outputs(outputs_dir):
     outputs = {}
     for filepath in glob.glob(os.path.join(outputs_dir, '*.json')):
@@ -19,6 +58,36 @@ def load_task1a_outputs(outputs_dir):
     return outputs
 
 
+def validate_spec(raw_spec):
+    """Raise ValueError unless `raw_spec` has the challenge1b_input.json fields 1B reads."""
+    if not isinstance(raw_spec, dict):
+        raise ValueError("spec must be a JSON object")
+    for section, field in (("persona", "role"), ("job_to_be_done", "task")):
+        value = raw_spec.get(section)
+        if not isinstance(value, dict) or not isinstance(value.get(field), str):
+            raise ValueError(f'"{section}" must be an object with a string "{field}"')
+    docs = raw_spec.get("documents")
+    if not isinstance(docs, list):
+        raise ValueError('"documents" must be a list')
+    for i, d in enumerate(docs):
+        if not isinstance(d, dict) or not all(isinstance(d.get(k), str) for k in ("filename", "title")):
+            raise ValueError(f'documents[{i}] must be an object with string "filename" and "title"')
+
+
+def document_keys(task1a_outputs):
+    """Normalized stem -> 1A output name, for matching spec filenames to outputs."""
+    return {_normalize_stem(k): k for k in task1a_outputs}
+
+
+def allowed_documents(raw_spec, doc_keys):
+    """1A output names for the spec's documents (None = whole corpus)."""
+    docs = raw_spec.get("documents")
+    if not docs:
+        return None
+    stems = {_normalize_stem(d["filename"]) for d in docs}
+    return {doc_keys[k] for k in stems if k in doc_keys}
+
+
 def write_output1b(result_dict, output_path):
     os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
     with open(output_path, 'w', encoding='utf-8') as f:
@@ -30,13 +99,58 @@ def _normalize_stem(name: str) -> str:
     return re.sub(r'[^0-9a-zA-Z]+', '', stem).lower()
 
 
-def extract_section_body(section_list, input_pdf_dir):
+class PageLineCache:
+    """
+    Per-run LRU of parsed page lines: (pdf_path, page_idx) -> [(y_top, text), ...].
+    Sections that share or span pages reuse one get_text('dict') parse.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._lines = OrderedDict()
+
+    def get(self, pdf_path, doc, page_idx):
+        key = (pdf_path, page_idx)
+        lines = self._lines.get(key)
+        if lines is not None:
+            self._lines.move_to_end(key)
+            return lines
+        lines = []
+        for block in doc[page_idx].get_text('dict')['blocks']:
+            for line in block.get('lines', []):
+                t = ' '.join(span['text'] for span in line['spans']).strip()
+                if t:
+                    lines.append((line['bbox'][1], t))
+        self._lines[key] = lines
+        if len(self._lines) > self.maxsize:
+            self._lines.popitem(last=False)
+        return lines
+
+
+def _resolve_page_idx(sec):
+    """0-based page to slice a section from; prefers the physical index from 1A coordinates."""
+    if sec.get('page_index') is not None and sec.get('bbox'):
+        return int(sec['page_index'])
+    page_n = sec.get('page_number')
+    if page_n is None:
+        page_n = sec.get('page', 1)
+    # Convert and clamp to 0-based index
+    return page_n - 1 if page_n >= 1 else 0
+
+
+def extract_section_body(section_list, input_pdf_dir, cache_pages=256, cache=None):
     """
     For each section in `section_list` (global importance order), finds its in-document successor,
     then extracts only the text between them. Returns list of dicts with keys:
       - document
       - refined_text
-      - page_number  (0-based)
+      - page_number  (the section's own page_number, as given; the page
+                      actually sliced, e.g. the physical 1A page_index, stays internal)
+
+    Each PDF is opened once; its sections are sorted by position and swept in a
+    single pass; pass a shared PageLineCache as `cache` to reuse parsed pages
+    across calls over the same PDFs. When a section carries 1A coordinates ("page_index" + "bbox"),
+    the heading bottom is used directly instead of searching the page for it.
     """
     # Build exact and normalized filename maps
     pdf_map_exact = {
@@ -48,110 +162,78 @@ def extract_section_body(section_list, input_pdf_dir):
         for name, path in pdf_map_exact.items()
     }
 
-    # 1) Annotate each valid section with page_idx & y_start
-    valid_secs = []
-    for sec in section_list:
+    # 1) Group sections by PDF, remembering their global position
+    by_pdf = defaultdict(list)
+    for pos, sec in enumerate(section_list):
         doc_name = sec.get('document')
         # Locate PDF path
         pdf_path = pdf_map_exact.get(doc_name) or pdf_map_norm.get(_normalize_stem(doc_name))
         if not pdf_path or not os.path.exists(pdf_path):
             print(f"[DEBUG] ❌ PDF not found for section {doc_name!r}")
             continue
+        by_pdf[pdf_path].append((pos, sec))
 
-        # Resolve page_number
-        page_n = sec.get('page_number')
-        if page_n is None:
-            page_n = sec.get('page', 1)
-        # Convert and clamp to 0-based index
-        page_idx = page_n - 1 if page_n >= 1 else 0
-
-        # Open PDF & validate page_idx
+    cache = cache if cache is not None else PageLineCache(cache_pages)
+    results_at = {}
+    for pdf_path, entries in by_pdf.items():
         doc = fitz.open(pdf_path)
-        if page_idx < 0 or page_idx >= doc.page_count:
-            print(f"[DEBUG] ⚠ invalid page_idx={page_idx} for {doc_name!r} (has {doc.page_count} pages)")
+        try:
+            # 2) Annotate each valid section with page_idx & y_start
+            located = []
+            for pos, sec in entries:
+                page_idx = _resolve_page_idx(sec)
+                if page_idx < 0 or page_idx >= doc.page_count:
+                    print(f"[DEBUG] ⚠ invalid page_idx={page_idx} for {sec.get('document')!r} "
+                          f"(has {doc.page_count} pages)")
+                    continue
+                if sec.get('page_index') is not None and sec.get('bbox'):
+                    y_start = float(sec['bbox'][3])
+                else:
+                    rects = doc[page_idx].search_for(sec.get('section_title', ''))
+                    y_start = rects[0].y1 if rects else 0.0
+                sec['_pdf_path'] = pdf_path
+                sec['_page_idx'] = page_idx
+                sec['y_start']   = y_start
+                located.append((pos, sec))
+
+            # 3) Sort within the document and sweep with successor links
+            located.sort(key=lambda e: (e[1]['_page_idx'], e[1]['y_start']))
+            for i, (pos, sec) in enumerate(located):
+                next_sec = located[i + 1][1] if i + 1 < len(located) else None
+                results_at[pos] = {
+                    "document":     sec['document'],
+                    "refined_text": ' '.join(_body_lines(cache, pdf_path, doc, sec, next_sec)),
+                    # the caller's page_number, so this entry and its
+                    # extracted_sections entry always report the same page
+                    "page_number":  sec.get('page_number', sec['_page_idx'])
+                }
+        finally:
             doc.close()
-            continue
 
-        # Find y_start on this page
-        pg = doc[page_idx]
-        rects = pg.search_for(sec.get('section_title', ''))
-        y_start = rects[0].y1 if rects else 0.0
-        doc.close()
-
-        # Annotate and collect
-        sec['_pdf_path'] = pdf_path
-        sec['_page_idx'] = page_idx
-        sec['y_start']   = y_start
-        valid_secs.append(sec)
-
-    # 2) Group & sort within each document
-    from collections import defaultdict
-    doc_groups = defaultdict(list)
-    for sec in valid_secs:
-        doc_groups[sec['document']].append(sec)
-    for group in doc_groups.values():
-        group.sort(key=lambda s: (s['_page_idx'], s['y_start']))
-
-    # 3) Extract bodies between each heading and its successor
-    results = []
-    for sec in valid_secs:
-        fname    = sec['document']
-        page_idx = sec['_page_idx']
-        y0       = sec['y_start']
-        pdf_path = sec['_pdf_path']
-
-        group    = doc_groups[fname]
-        idx      = group.index(sec)
-        next_sec = group[idx + 1] if idx + 1 < len(group) else None
-
-        # Same-page clip
-        y1 = None
-        if next_sec and next_sec['_page_idx'] == page_idx:
-            y1 = next_sec['y_start']
+    return [results_at[pos] for pos in sorted(results_at)]
 
-        doc = fitz.open(pdf_path)
-        body_lines = []
 
-        # Current page slice
-        pg = doc[page_idx]
-        for block in pg.get_text('dict')['blocks']:
-            for line in block.get('lines', []):
-                y = line['bbox'][1]
-                if y < y0 or (y1 is not None and y >= y1):
-                    continue
-                t = ' '.join(span['text'] for span in line['spans']).strip()
-                if t:
-                    body_lines.append(t)
+def _body_lines(cache, pdf_path, doc, sec, next_sec):
+    """Lines between `sec` and its in-document successor (or the end of its page)."""
+    page_idx = sec['_page_idx']
+    y0       = sec['y_start']
+
+    # Same-page clip
+    y1 = None
+    if next_sec and next_sec['_page_idx'] == page_idx:
+        y1 = next_sec['y_start']
 
+    # Current page slice
+    body = [t for y, t in cache.get(pdf_path, doc, page_idx)
+            if y >= y0 and (y1 is None or y < y1)]
+
+    if next_sec and next_sec['_page_idx'] > page_idx:
+        next_idx = next_sec['_page_idx']
         # Intermediate pages
-        if next_sec and next_sec['_page_idx'] > page_idx:
-            next_idx = next_sec['_page_idx']
-            for pno in range(page_idx + 1, next_idx):
-                pg2 = doc[pno]
-                for block in pg2.get_text('dict')['blocks']:
-                    for line in block.get('lines', []):
-                        t = ' '.join(span['text'] for span in line['spans']).strip()
-                        if t:
-                            body_lines.append(t)
-            # Clip next page
-            pgn = doc[next_idx]
-            y_end = next_sec['y_start']
-            for block in pgn.get_text('dict')['blocks']:
-                for line in block.get('lines', []):
-                    y = line['bbox'][1]
-                    if y >= y_end:
-                        continue
-                    t = ' '.join(span['text'] for span in line['spans']).strip()
-                    if t:
-                        body_lines.append(t)
-
-        doc.close()
-
-        refined = ' '.join(body_lines)
-        results.append({
-            "document":     fname,
-            "refined_text": refined,
-            "page_number":  page_idx  # 0-based
-        })
-
-    return results
+        for pno in range(page_idx + 1, next_idx):
+            body.extend(t for _, t in cache.get(pdf_path, doc, pno))
+        # Clip next page
+        y_end = next_sec['y_start']
+        body.extend(t for y, t in cache.get(pdf_path, doc, next_idx) if y < y_end)
+
+    return body